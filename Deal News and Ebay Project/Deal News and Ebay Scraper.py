@@ -1,11 +1,36 @@
-from selenium import webdriver  
-from selenium.webdriver.chrome.service import Service                  
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, InvalidSessionIdException, WebDriverException
 import Levenshtein
 import pandas as pd
-from selenium.webdriver.chrome.options import Options
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from collections import defaultdict
+from urllib.parse import urlparse, urlencode, urljoin
+from html.parser import HTMLParser
+import abc
+import asyncio
+import csv
+import io
+import http.client
+import queue
+import threading
+import time
+import glob
+import os
+import sqlite3
+import json
+import re
+import random
+from model_artifact import ModelScorer
+from run_stats import RunStats
+from project_paths import project_file, chromedriver_path
+from product_columns import excel_columns, price_aggregate_columns
+
+# rapidfuzz scores whole lists at once with the same ratio as Levenshtein but it's optional
+try:
+    from rapidfuzz import process as rapidfuzz_process, fuzz as rapidfuzz_fuzz
+except ImportError:
+    rapidfuzz_process = None
 
 # Levenshtein can be played around with .7 and above looked pretty accurate even further down ebays search
 # for scrape extra = False if price is not 6 off from product and websites it likely messed up
@@ -15,8 +40,11 @@ from selenium.webdriver.chrome.options import Options
 
 class Product():
     
+    # fixed attributes keep each product small and status is pending, priced, rejected or error instead of removing products from lists
+    __slots__ = ('name', 'price', 'old_price', 'website', 'ebay_price', 'category', 'difference_price', 'binary_answer', 'binary_answer_check', 'feasability', 'status')
+    
     # constructor with default values
-    def __init__(self, name = 'N/A', price = 0, old_price = 0, website = 'N/A', ebay_price = 0, category = 'N/A', difference_price = 0, binary_answer = 0, binary_answer_check = 0, feasability = 0):
+    def __init__(self, name = 'N/A', price = 0, old_price = 0, website = 'N/A', ebay_price = 0, category = 'N/A', difference_price = 0, binary_answer = 0, binary_answer_check = 0, feasability = 0, status = 'pending'):
         self.name = name
         self.price = price
         self.old_price = old_price
@@ -27,6 +55,7 @@ class Product():
         self.binary_answer = binary_answer
         self.binary_answer_check = binary_answer_check
         self.feasability = feasability
+        self.status = status
       
     # checks if deal news products are legit
     def dn_product_check(self):
@@ -40,10 +69,15 @@ class Product():
         self.price = float(self.price.split()[0].replace('$', '').replace(',', ''))
         
     # gets difference in price and the binary answer to whether product is worth pursuing
-    def fix_diff_price_and_binary_ans(self):
-        if(self.ebay_price != 0):
-            self.difference_price = int(self.ebay_price - self.price - self.ebay_price * .13)
-        if(self.difference_price >= 45):
+    # fee rate is the share of the ebay price lost to fees and profit threshold is the least difference worth pursuing
+    # an ebay price estimate (like the median from the price history) can be used instead of the scraped ebay price
+    def fix_diff_price_and_binary_ans(self, profit_threshold = 45, fee_rate = .13, ebay_price_estimate = None):
+        ebay_price = self.ebay_price
+        if(ebay_price_estimate is not None):
+            ebay_price = ebay_price_estimate
+        if(ebay_price != 0):
+            self.difference_price = int(ebay_price - self.price - ebay_price * fee_rate)
+        if(self.difference_price >= profit_threshold):
             self.binary_answer = 1
      
     # puts attributes in format to be exported to excel        
@@ -54,18 +88,1193 @@ class Product():
     def __str__(self):
         return '\n' + self.name + '\n' + str(self.price) + '\n' + str(self.old_price) + '\n' + self.website + '\n' + str(self.ebay_price) + '\n' + self.category + '\n' + str(self.difference_price) + '\n' + str(self.binary_answer)
 
-class Scraper():
-    
-    # class-wide variables no need for a constructor
-    executable_path = Service('C:/Computer Science/chromedriver_win32/chromedriver.exe') # put chromedriver path here
+# creates a chrome browser (used for the Scraper browser and for each pooled ebay worker)
+# selenium's webdriver is only imported once a browser is needed
+def create_browser():
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.chrome.options import Options
+    executable_path = Service(chromedriver_path()) # chromedriver path is the CHROMEDRIVER_PATH environment variable
     chrome_options = Options()
     chrome_options.add_argument('--disable-dev-shm-usage') 
-    browser = webdriver.Chrome(options = chrome_options, service = executable_path)
-    wait = WebDriverWait(browser, 5)
+    return webdriver.Chrome(options = chrome_options, service = executable_path)
+
+# limits how often requests are sent to each host so pooled workers don't flood a website
+class RateLimiter():
+    
+    # requests per second is shared by every thread using the limiter and 0 means no limit
+    def __init__(self, requests_per_second = 2):
+        self.interval = 0
+        if(requests_per_second > 0):
+            self.interval = 1 / requests_per_second
+        self.next_request_times = {}
+        self.lock = threading.Lock()
+    
+    # reserves the next request slot for the url's host and sleeps until it comes
+    def wait(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            request_time = max(self.next_request_times.get(host, now), now)
+            self.next_request_times[host] = request_time + self.interval
+        if(request_time > now):
+            time.sleep(request_time - now)
+
+# how long to wait for page elements learned from how long each selector has taken to show up
+# shared by every session so the timeouts are learned from all of the pages loaded
+class WaitPolicy():
+    
+    # timeouts start at the default and become margin times the slowest recent load time (kept between min and max timeout)
+    # settle time is how long to keep looking after the page has finished loading before giving up on an element
+    def __init__(self, default_timeout = 5, min_timeout = 1, max_timeout = 10, margin = 2, settle_time = .5, poll_interval = .1, history = 50, stats = None):
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.margin = margin
+        self.settle_time = settle_time
+        self.poll_interval = poll_interval
+        self.history = history
+        self.load_times = defaultdict(list)
+        self.lock = threading.Lock()
+        self.stats = stats or RunStats()
+        
+    # timeout for a selector from its recent load times
+    def timeout(self, selector):
+        with self.lock:
+            load_times = self.load_times[selector]
+            if(len(load_times) < 5):
+                return self.default_timeout
+            return min(self.max_timeout, max(self.min_timeout, max(load_times) * self.margin))
+    
+    # saves how long a selector took to show up
+    def record(self, selector, seconds):
+        with self.lock:
+            load_times = self.load_times[selector]
+            load_times.append(seconds)
+            if(len(load_times) > self.history):
+                del load_times[0]
+    
+    # waits for elements and returns them but raises a TimeoutException as soon as the page has clearly finished loading without them
+    def wait_for_all(self, browser, by, selector):
+        start = time.monotonic()
+        deadline = start + self.timeout(selector)
+        complete_since = None
+        while(True):
+            elements = browser.find_elements(by, selector)
+            if(len(elements) > 0):
+                self.record(selector, time.monotonic() - start)
+                return elements
+            now = time.monotonic()
+            if(now >= deadline):
+                self.stats.count('wait timeouts')
+                raise TimeoutException('Timed out waiting for ' + selector)
+            
+            # the page is done loading so the element isn't coming once the settle time passes
+            if(browser.execute_script('return document.readyState') == 'complete'):
+                if(complete_since is None):
+                    complete_since = now
+                elif(now - complete_since >= self.settle_time):
+                    self.stats.count('wait early exits')
+                    raise TimeoutException(selector + ' not found after the page finished loading')
+            else:
+                complete_since = None
+            time.sleep(self.poll_interval)
+
+# stops a session from hammering a site that keeps failing (like a blocked or crashed browser)
+# only session failures (pages that don't load or invalid sessions) are recorded and not a product that can't be found
+class CircuitBreaker():
+    
+    # after failure limit failures in a row the session waits until cooldown seconds pass and then one try is allowed
+    def __init__(self, failure_limit = 5, cooldown = 60, stats = None):
+        self.failure_limit = failure_limit
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_time = None
+        self.stats = stats or RunStats()
+    
+    # sleeps out the rest of the cooldown if the circuit is open instead of failing the products that are left
+    def wait(self):
+        if(self.opened_time is not None):
+            remaining = self.cooldown - (time.monotonic() - self.opened_time)
+            if(remaining > 0):
+                self.stats.count('circuit open waits')
+                time.sleep(remaining)
+    
+    def record_success(self):
+        self.failures = 0
+        self.opened_time = None
+    
+    def record_failure(self):
+        self.failures += 1
+        if(self.failures >= self.failure_limit):
+            self.opened_time = time.monotonic()
+    
+    # calls a function with bounded exponential backoff between attempts
+    # on invalid session is called to restart the browser when its session id is no longer valid
+    def retry(self, function, attempts = 3, base_delay = .5, max_delay = 8, on_invalid_session = None):
+        for attempt in range(0, attempts):
+            self.wait()
+            try:
+                result = function()
+                self.record_success()
+                return result
+            except InvalidSessionIdException as e:
+                error = e
+                if(on_invalid_session is not None):
+                    on_invalid_session()
+            except Exception as e:
+                error = e
+            self.record_failure()
+            if(attempt < attempts - 1):
+                self.stats.count('retries')
+                time.sleep(min(max_delay, base_delay * 2 ** attempt))
+        raise error
+
+# a browser used to search ebay (serial scraping uses the Scraper browser and each pooled worker gets its own)
+class EbaySession():
+    
+    # if no browser is passed a new one is created and closed with the session
+    def __init__(self, browser = None, rate_limiter = None, stats = None, wait_policy = None):
+        self.owns_browser = browser is None
+        if(browser is None):
+            browser = create_browser()
+        self.browser = browser
+        self.rate_limiter = rate_limiter
+        self.stats = stats or RunStats()
+        self.wait_policy = wait_policy or WaitPolicy(stats = self.stats)
+        self.circuit_breaker = CircuitBreaker(stats = self.stats)
+        
+    # waits for the rate limiter before anything that loads an ebay page
+    def throttle(self, url = 'https://www.ebay.com/'):
+        if(self.rate_limiter is not None):
+            self.rate_limiter.wait(url)
+    
+    # loads a page in the browser without counting toward the circuit breaker
+    def load(self, url):
+        self.throttle(url)
+        self.browser.get(url)
+    
+    # loads a page in the browser and a page that doesn't load counts as a session failure (an invalid session is handled by search)
+    def get(self, url):
+        try:
+            self.load(url)
+        except InvalidSessionIdException:
+            raise
+        except WebDriverException:
+            self.circuit_breaker.record_failure()
+            raise
+        self.circuit_breaker.record_success()
+    
+    # replaces the browser with a new one (like when its session id is no longer valid)
+    def restart(self):
+        try:
+            self.browser.quit()
+        except:
+            pass
+        self.browser = create_browser()
+        self.owns_browser = True
+        self.stats.count('browser restarts')
+    
+    # opens ebay and ensures it loads because sometimes it gets invalid session ids
+    def open(self):
+        self.circuit_breaker.retry(lambda: self.load('https://www.ebay.com/'), attempts = 5, on_invalid_session = self.restart)
+    
+    # searches ebay for a product name with the new, buy it now and free shipping filters
+    # returns scraped prices, names and categories or None if ebay found no exact match
+    # a session whose pages keep failing to load waits for a while and an invalid session gets a new browser
+    # a product without the buy it now or free shipping filters or a category only fails that product
+    def search(self, name):
+        self.circuit_breaker.wait()
+        try:
+            return self.search_browser(name)
+        except InvalidSessionIdException:
+            self.circuit_breaker.record_failure()
+            self.restart()
+            self.open()
+            raise
+    
+    # searches using the browser
+    def search_browser(self, name):
+        
+        # enters Product name into search and enters could cause error 
+        with self.stats.stage('ebay search'):
+            self.browser.find_element(By.ID, "gh-ac").send_keys(name)
+            self.throttle()
+            self.browser.find_element(By.ID, "gh-btn").click()
+        
+        # checks for the "no exact match found" and if it finds disregard product else keep going
+        try:
+            self.browser.find_element(By.CLASS_NAME, 'srp-save-null-search__heading')
+            self.get('https://www.ebay.com/') 
+            return None
+        except:
+            pass
+        
+        with self.stats.stage('ebay filter clicks'):
+            
+            # clicks the new option but needs try except for special cases 
+            try:
+                new_link = self.browser.find_element(By.PARTIAL_LINK_TEXT, "New")
+                self.throttle()
+                new_link.click()
+            except:
+                pass
+            
+            # tries to click buy it now and free shipping options else likely not a good product so causes error
+            buy_it_now_link = self.browser.find_element(By.PARTIAL_LINK_TEXT, "Buy It Now")
+            self.throttle()
+            buy_it_now_link.click()
+            free_shipping_link = self.browser.find_element(By.LINK_TEXT, "Free Shipping")
+            self.throttle()
+            free_shipping_link.click()
+            
+        with self.stats.stage('ebay wait'):
+            
+            # scrapes ebay prices and names 
+            ebay_prices = [x.text for x in self.wait_policy.wait_for_all(self.browser, By.CLASS_NAME, 's-item__price')]
+            ebay_names = [x.text for x in self.wait_policy.wait_for_all(self.browser, By.CLASS_NAME, 's-item__title')]
+            
+            # tries to scrape category of product but if it can't find disregard the product because in later steps it will be removed
+            category = [x.text for x in self.wait_policy.wait_for_all(self.browser, By.CLASS_NAME, 'srp-refine__category__item')]
+        
+        # resets browser for next product
+        with self.stats.stage('ebay page load'):
+            self.get('https://www.ebay.com/') 
+        return ebay_prices, ebay_names, category
+    
+    # closes the browser if the session created it
+    def close(self):
+        if(self.owns_browser):
+            try:
+                self.browser.quit()
+            except:
+                pass
+
+# keeps open keep-alive connections per host so http requests don't reconnect every time
+class ConnectionPool():
+    
+    # max idle connections is how many open connections are kept per host
+    def __init__(self, max_idle_connections = 8, timeout = 10):
+        self.max_idle_connections = max_idle_connections
+        self.timeout = timeout
+        self.idle_connections = {}
+        self.lock = threading.Lock()
+        
+    # gets an idle connection for the host or opens a new one
+    def acquire(self, scheme, host):
+        with self.lock:
+            idle = self.idle_connections.setdefault((scheme, host), queue.LifoQueue())
+        try:
+            return idle.get_nowait()
+        except queue.Empty:
+            if(scheme == 'https'):
+                return http.client.HTTPSConnection(host, timeout = self.timeout)
+            return http.client.HTTPConnection(host, timeout = self.timeout)
+    
+    # puts a connection back to be reused or closes it if there are already enough idle ones
+    def release(self, scheme, host, connection):
+        idle = self.idle_connections[(scheme, host)]
+        if(idle.qsize() < self.max_idle_connections):
+            idle.put(connection)
+        else:
+            connection.close()
+            
+    # sends a get request and returns the status and body text (follows redirects with absolute or relative locations)
+    def get(self, url, headers = {}, redirects = 3):
+        parsed = urlparse(url)
+        path = parsed.path or '/'
+        if(parsed.query):
+            path += '?' + parsed.query
+        
+        # a kept alive connection may have been closed by the server so retry once on a fresh one
+        for attempt in range(0, 2):
+            connection = self.acquire(parsed.scheme, parsed.netloc)
+            try:
+                connection.request('GET', path, headers = headers)
+                response = connection.getresponse()
+                body = response.read()
+                break
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                if(attempt == 1):
+                    raise
+        
+        # server closing the connection means it can't be reused
+        if(response.will_close):
+            connection.close()
+        else:
+            self.release(parsed.scheme, parsed.netloc, connection)
+            
+        if(response.status in (301, 302, 303, 307, 308) and redirects > 0):
+            location = response.getheader('Location')
+            if(location is None):
+                raise ValueError(url + ' redirected with status ' + str(response.status) + ' but has no Location header')
+            return self.get(urljoin(url, location), headers, redirects - 1)
+        return response.status, body.decode('utf-8', errors = 'replace')
+    
+    # closes all idle connections
+    def close(self):
+        with self.lock:
+            for idle in self.idle_connections.values():
+                while(idle.empty() == False):
+                    idle.get_nowait().close()
+
+# parses the text of elements with certain class names out of html the way selenium's element text would
+class ClassTextParser(HTMLParser):
+    
+    # tags that don't have closing tags and tags that start a new line in element text
+    void_tags = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+    block_tags = {'br', 'div', 'li', 'ul', 'ol', 'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'tr', 'table', 'section'}
+    
+    # class names is a list of classes to get the text of
+    def __init__(self, class_names = []):
+        super().__init__(convert_charrefs = True)
+        self.class_names = set(class_names)
+        self.texts = {class_name: [] for class_name in class_names}
+        self.open_tags = [] # stack of (tag, texts started at tag)
+        self.active_texts = []
+        
+    def handle_starttag(self, tag, attrs):
+        if(tag in self.block_tags):
+            for text in self.active_texts:
+                text.append('\n')
+        if(tag in self.void_tags):
+            return
+        started_texts = []
+        for attr, value in attrs:
+            if(attr == 'class' and value):
+                for class_name in self.class_names.intersection(value.split()):
+                    text = []
+                    self.texts[class_name].append(text)
+                    started_texts.append(text)
+        self.active_texts.extend(started_texts)
+        self.open_tags.append((tag, started_texts))
+        
+    def handle_endtag(self, tag):
+        
+        # closes any unclosed tags inside of the ending tag like a browser would
+        # texts are removed by identity because nested elements with the same class can have equal texts
+        for i in range(len(self.open_tags) - 1, -1, -1):
+            if(self.open_tags[i][0] == tag):
+                closed_texts = {id(text) for open_tag, started_texts in self.open_tags[i:] for text in started_texts}
+                if(len(closed_texts) > 0):
+                    self.active_texts = [text for text in self.active_texts if id(text) not in closed_texts]
+                del self.open_tags[i:]
+                break
+        if(tag in self.block_tags):
+            for text in self.active_texts:
+                text.append('\n')
+                
+    def handle_data(self, data):
+        for text in self.active_texts:
+            text.append(data)
+            
+    # returns the text of each element with the class in the order they appear
+    def get_texts(self, class_name):
+        texts = []
+        for text in self.texts[class_name]:
+            lines = [' '.join(line.split()) for line in ''.join(text).split('\n')]
+            texts.append('\n'.join([line for line in lines if line != '']))
+        return texts
+
+# searches ebay over http without a browser by building the filtered search url directly
+class EbayHttpSession():
+    
+    # sessions can share a connection pool and a rate limiter and base url can point searches at a local stub server
+    def __init__(self, connection_pool = None, rate_limiter = None, stats = None, base_url = 'https://www.ebay.com'):
+        if(connection_pool is None):
+            connection_pool = ConnectionPool()
+        self.connection_pool = connection_pool
+        self.base_url = base_url
+        self.rate_limiter = rate_limiter
+        self.stats = stats or RunStats()
+        self.circuit_breaker = CircuitBreaker(stats = self.stats)
+        self.headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0 Safari/537.36', 'Accept-Language': 'en-US,en;q=0.9'}
+    
+    # no page has to be opened before searching
+    def open(self):
+        pass
+    
+    # same as clicking the new, buy it now and free shipping filters
+    def search_url(self, name):
+        return self.base_url + '/sch/i.html?' + urlencode({'_nkw': name, 'LH_ItemCondition': '1000', 'LH_BIN': '1', 'LH_FS': '1'})
+    
+    # parses an ebay search results page the same way the browser scrapes it
+    # returns scraped prices, names and categories or None if ebay found no exact match
+    def parse_results(self, html):
+        parser = ClassTextParser(['srp-save-null-search__heading', 's-item__price', 's-item__title', 'srp-refine__category__item'])
+        parser.feed(html)
+        parser.close()
+        if(len(parser.texts['srp-save-null-search__heading']) > 0):
+            return None
+        ebay_prices = parser.get_texts('s-item__price')
+        ebay_names = parser.get_texts('s-item__title')
+        category = parser.get_texts('srp-refine__category__item')
+        
+        # the browser would time out waiting for these so error in the same way
+        if(len(ebay_prices) == 0 or len(ebay_names) == 0 or len(category) == 0):
+            raise ValueError('Ebay results page is missing prices, names or categories')
+        return ebay_prices, ebay_names, category
+    
+    # searches ebay for a product name with the new, buy it now and free shipping filters
+    # a session that keeps failing (like getting blocked) waits for a while
+    def search(self, name):
+        self.circuit_breaker.wait()
+        url = self.search_url(name)
+        if(self.rate_limiter is not None):
+            self.rate_limiter.wait(url)
+        with self.stats.stage('ebay page load'):
+            try:
+                status, html = self.connection_pool.get(url, self.headers)
+            except Exception:
+                self.circuit_breaker.record_failure()
+                raise
+        if(status != 200):
+            self.circuit_breaker.record_failure()
+            raise ValueError('Ebay returned status ' + str(status))
+        self.circuit_breaker.record_success()
+        with self.stats.stage('ebay parse'):
+            return self.parse_results(html)
+    
+    # connections are owned by the pool
+    def close(self):
+        pass
+
+# normalizes a product name so small differences in case, punctuation and spacing are treated as the same product
+def normalize_name(name):
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', name.lower()).split())
+
+# on-disk cache of ebay results per normalized product name so repeated deals aren't searched again
+class EbayCache():
+    
+    # ttl days is how long results stay valid and max entries bounds the size using least recently used eviction
+    def __init__(self, file = '', ttl_days = 7, max_entries = 10000, top_n = 10):
+        self.ttl_seconds = ttl_days * 24 * 60 * 60
+        self.max_entries = max_entries
+        self.top_n = top_n
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(file, check_same_thread = False)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS ebay_cache (name_key TEXT PRIMARY KEY, found INTEGER, ebay_price REAL, category TEXT, titles TEXT, prices TEXT, created REAL, last_used REAL)')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS ebay_cache_last_used ON ebay_cache (last_used)')
+        self.connection.commit()
+        
+    # returns a dictionary of cached results for a product name or None if it isn't cached or expired
+    def get(self, name):
+        name_key = normalize_name(name)
+        now = time.time()
+        with self.lock:
+            row = self.connection.execute('SELECT found, ebay_price, category, titles, prices, created FROM ebay_cache WHERE name_key = ?', (name_key,)).fetchone()
+            if(row is None):
+                self.misses += 1
+                return None
+            if(now - row[5] > self.ttl_seconds):
+                self.connection.execute('DELETE FROM ebay_cache WHERE name_key = ?', (name_key,))
+                self.connection.commit()
+                self.expired += 1
+                self.misses += 1
+                return None
+            self.connection.execute('UPDATE ebay_cache SET last_used = ? WHERE name_key = ?', (now, name_key))
+            self.connection.commit()
+            self.hits += 1
+        return {'found': row[0] == 1, 'ebay_price': row[1], 'category': row[2], 'titles': json.loads(row[3]), 'prices': json.loads(row[4])}
+    
+    # caches results for a product name (found is False when ebay had no exact match) and evicts the least recently used entries
+    def put(self, name, found = True, ebay_price = 0, category = 'N/A', titles = [], prices = []):
+        now = time.time()
+        with self.lock:
+            self.connection.execute('INSERT OR REPLACE INTO ebay_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?)', (normalize_name(name), int(found), ebay_price, category, json.dumps(titles[:self.top_n]), json.dumps(prices[:self.top_n]), now, now))
+            entry_count = self.connection.execute('SELECT COUNT(*) FROM ebay_cache').fetchone()[0]
+            if(entry_count > self.max_entries):
+                self.connection.execute('DELETE FROM ebay_cache WHERE name_key IN (SELECT name_key FROM ebay_cache ORDER BY last_used LIMIT ?)', (entry_count - self.max_entries,))
+            self.connection.commit()
+            
+    # prints hit and miss counters
+    def print_stats(self):
+        lookups = self.hits + self.misses
+        hit_rate = 0
+        if(lookups > 0):
+            hit_rate = round(self.hits / lookups * 100, 1)
+        print('\nEbay cache: ' + str(self.hits) + ' hits, ' + str(self.misses) + ' misses (' + str(self.expired) + ' expired), ' + str(hit_rate) + '% hit rate')
+        
+    def close(self):
+        self.connection.close()
+
+# scores deal news names against all ebay titles on a results page (or many pages) in one vectorized call
+# method is ratio (the same score as Levenshtein.ratio) or token_set (share of words the titles have in common)
+# depth is how many ebay results are checked and the first result uses a looser threshold than the rest
+class TitleMatcher():
+    
+    def __init__(self, method = 'ratio', depth = 5, first_threshold = .4, threshold = .6):
+        self.method = method
+        self.depth = depth
+        self.first_threshold = first_threshold
+        self.threshold = threshold
+        
+    # returns a matrix of scores between 0 and 1 with a row for each name and a column for each title
+    def score(self, names, titles):
+        if(len(names) == 0 or len(titles) == 0):
+            return np.zeros((len(names), len(titles)))
+        if(self.method == 'ratio'):
+            if(rapidfuzz_process is not None):
+                return rapidfuzz_process.cdist(names, titles, scorer = rapidfuzz_fuzz.ratio, dtype = np.float32) / 100
+            return np.array([[Levenshtein.ratio(name, title) for title in titles] for name in names])
+        if(self.method == 'token_set'):
+            
+            # one hot encodes the words of every name and title using a shared vocabulary
+            vocabulary = {}
+            name_tokens = [[vocabulary.setdefault(word, len(vocabulary)) for word in set(name.lower().split())] for name in names]
+            title_tokens = [[vocabulary.setdefault(word, len(vocabulary)) for word in set(title.lower().split())] for title in titles]
+            name_matrix = np.zeros((len(names), len(vocabulary)), dtype = np.float32)
+            title_matrix = np.zeros((len(titles), len(vocabulary)), dtype = np.float32)
+            for i, tokens in enumerate(name_tokens):
+                name_matrix[i, tokens] = 1
+            for i, tokens in enumerate(title_tokens):
+                title_matrix[i, tokens] = 1
+                
+            # words in common over the average amount of words (dice coefficient)
+            shared = name_matrix @ title_matrix.T
+            total = name_matrix.sum(axis = 1)[:, None] + title_matrix.sum(axis = 1)[None, :]
+            return np.divide(2 * shared, total, out = np.zeros_like(shared), where = total > 0)
+        raise ValueError('Unknown title matching method: ' + self.method)
+    
+    # turns an ebay price like $12.99 or $12.99 to $15.99 into a float
+    def parse_price(self, ebay_price):
+        return float(ebay_price.replace('$', '').replace(',', '').split()[0])
+    
+    # gets the prices of the ebay results that matched each name from its results page in a single scoring call
+    # pages is a list of (ebay names, ebay prices) for each name
+    def matched_prices(self, names, pages):
+        
+        # the first ebay result is a placeholder so results start at 1 and are cut off at the depth
+        candidate_titles = []
+        page_slices = []
+        for ebay_names, ebay_prices in pages:
+            search_len = min(self.depth, len(ebay_prices))
+            page_titles = ebay_names[1:max(search_len, 2)]
+            if(len(page_titles) == 0):
+                raise IndexError('Ebay results page has no results to match')
+            page_slices.append((len(candidate_titles), len(page_titles)))
+            candidate_titles.extend(page_titles)
+        scores = self.score(names, candidate_titles)
+        
+        matched_price_lists = []
+        for i, (ebay_names, ebay_prices) in enumerate(pages):
+            start, length = page_slices[i]
+            page_scores = scores[i, start:start + length]
+            
+            # different standard for first item found
+            matched_price_list = []
+            if(page_scores[0] > self.first_threshold):
+                matched_price_list.append(self.parse_price(ebay_prices[1]))
+            for j in range(1, length):
+                if(page_scores[j] > self.threshold):
+                    matched_price_list.append(self.parse_price(ebay_prices[j + 1]))
+            matched_price_lists.append(matched_price_list)
+        return matched_price_lists
+    
+    # gets the lowest matched ebay price for each name and 0 means no result matched
+    def lowest_prices(self, names, pages):
+        return [min(matched_price_list, default = 0) for matched_price_list in self.matched_prices(names, pages)]
+    
+    # gets the lowest matched ebay price for one name
+    def lowest_price(self, name, ebay_names, ebay_prices):
+        return self.lowest_prices([name], [(ebay_names, ebay_prices)])[0]
+
+# append-only file of products that finished their ebay lookup so an interrupted run can resume where it stopped
+# each line is a json record so a line cut off by a crash is simply ignored
+class PipelineCheckpoint():
+    
+    def __init__(self, file = ''):
+        self.file = file
+        self.lock = threading.Lock()
+        self.records = {}
+        if(os.path.exists(file)):
+            with open(file, encoding = 'utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.records[tuple(record['key'])] = record
+        
+    # products are identified by their deal news name, price and website
+    def key(self, Product_obj):
+        return [Product_obj.name, Product_obj.price, Product_obj.website]
+    
+    # checks if the product was already looked up in an earlier run
+    def is_done(self, Product_obj):
+        return tuple(self.key(Product_obj)) in self.records
+    
+    # appends a finished product with its status (priced or no match) and flushes it to disk
+    def append(self, Product_obj, status = 'priced'):
+        record = {'key': self.key(Product_obj), 'status': status, 'product': Product_obj.excel_format()}
+        with self.lock:
+            self.records[tuple(record['key'])] = record
+            with open(self.file, 'a', encoding = 'utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+    
+    # returns the priced products saved by earlier runs
+    def priced_products(self):
+        return [Product(*record['product'], status = 'priced') for record in self.records.values() if record['status'] == 'priced']
+    
+    # deletes the checkpoint once the run's results have been exported
+    def clear(self):
+        with self.lock:
+            self.records = {}
+            if(os.path.exists(self.file)):
+                os.remove(self.file)
+
+# sqlite table of scraped products so runs don't have to read and rewrite the whole excel file
+# a unique index on name, price and binary answer drops duplicate products on insert like drop_duplicates did
+class ProductStore():
+    
+    # sql column names in the same order as the excel columns
+    columns = ['name', 'price', 'old_price', 'website', 'ebay_price', 'category', 'difference_price', 'binary_answer', 'binary_answer_check', 'feasability']
+    
+    def __init__(self, file = ''):
+        self.file = file
+        self.connection = sqlite3.connect(file, check_same_thread = False)
+        self.lock = threading.Lock()
+        self.connection.execute('CREATE TABLE IF NOT EXISTS products (id INTEGER PRIMARY KEY, name TEXT, price REAL, old_price REAL, website TEXT, ebay_price REAL, category TEXT, difference_price REAL, binary_answer INTEGER, binary_answer_check INTEGER DEFAULT 0, feasability INTEGER DEFAULT 0, added REAL, updated REAL)')
+        self.connection.execute('CREATE UNIQUE INDEX IF NOT EXISTS products_unique ON products (name, price, binary_answer)')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS products_updated ON products (updated)')
+        self.connection.commit()
+        
+    # amount of stored products
+    def count(self):
+        return self.connection.execute('SELECT COUNT(*) FROM products').fetchone()[0]
+    
+    # adds rows in excel column order and skips empty rows and duplicates, returns the amount of rows added
+    def add_rows(self, rows):
+        now = time.time()
+        rows = [list(row) + [now, now] for row in rows if row[5] != '' and row[4] != 0]
+        with self.lock:
+            changes_before = self.connection.total_changes
+            self.connection.executemany('INSERT OR IGNORE INTO products (' + ', '.join(self.columns) + ', added, updated) VALUES (' + ', '.join(['?'] * (len(self.columns) + 2)) + ')', rows)
+            self.connection.commit()
+            return self.connection.total_changes - changes_before
+        
+    # adds Product objects and skips ones already stored
+    def add_products(self, product_list):
+        return self.add_rows([Product_obj.excel_format() for Product_obj in product_list])
+    
+    # one time import of the existing excel file
+    def import_excel(self, file = ''):
+        if(os.path.exists(file) == False):
+            print("\nCouldn't Find File")
+            return 0
+        df = pd.read_excel(file)[excel_columns]
+        df['Category'] = df['Category'].fillna('')
+        return self.add_rows(df.astype(object).where(df.notna(), None).values.tolist())
+    
+    # the rows the label editor indexes as (id, name, binary answer, binary answer check, feasability)
+    def label_rows(self):
+        return self.connection.execute('SELECT id, name, binary_answer, binary_answer_check, feasability FROM products').fetchall()
+    
+    # changes the manual answers of many rows in one transaction where changes is a list of (row id, binary answer check, feasability)
+    def set_manual_answers(self, changes):
+        now = time.time()
+        with self.lock:
+            self.connection.executemany('UPDATE products SET binary_answer_check = ?, feasability = ?, updated = ? WHERE id = ?', [(binary_answer_check, feasability, now, row_id) for row_id, binary_answer_check, feasability in changes])
+            self.connection.commit()
+    
+    # drop rows that are empty
+    def drop_empty_rows(self):
+        with self.lock:
+            self.connection.execute("DELETE FROM products WHERE category = '' OR category IS NULL OR ebay_price = 0")
+            self.connection.commit()
+    
+    # reads the stored products into a dataframe with the excel column names
+    def to_dataframe(self):
+        df = pd.read_sql_query('SELECT ' + ', '.join(self.columns) + ' FROM products ORDER BY id', self.connection)
+        df.columns = excel_columns
+        return df
+    
+    # exports to excel only when it's wanted
+    def export_excel(self, file = ''):
+        self.to_dataframe().to_excel(file, index = False)
+        print('\nSuccessfully exported to:', file)
+        
+    def close(self):
+        self.connection.close()
+
+# changes the manual answer columns (Binary Answer Check and Feasability) of many products at once in the excel file or product store
+# a name to rows index is built once so each label is a dictionary lookup instead of a scan of the name column
+# only the rows whose answers change are written (excel cells are edited in place instead of rewriting the dataframe)
+class LabelEditor():
+    
+    # if a product store is passed it's edited instead of the excel file
+    def __init__(self, file = '', store = None):
+        self.file = file
+        self.store = store
+        self.workbook = None
+        self.index = {}
+        self.changes = {} # row to [binary answer check, feasability]
+        
+        if(store is not None):
+            label_rows = store.label_rows()
+        else:
+            from openpyxl import load_workbook
+            self.workbook = load_workbook(file)
+            sheet = self.workbook.active
+            header = [cell.value for cell in sheet[1]]
+            self.cells = [header.index(column) for column in ['Name', 'Binary Answer', 'Binary Answer Check', 'Feasability']]
+            label_rows = [(row_number, row[self.cells[0]], row[self.cells[1]], row[self.cells[2]], row[self.cells[3]]) for row_number, row in enumerate(sheet.iter_rows(min_row = 2, values_only = True), 2)]
+        
+        # name to list of [row, binary answer, binary answer check, feasability]
+        for row, name, binary_answer, binary_answer_check, feasability in label_rows:
+            self.index.setdefault(name, []).append([row, binary_answer, binary_answer_check, feasability])
+    
+    # gets the [row, binary answer, binary answer check, feasability] of the rows for a product name
+    def rows_for_name(self, name):
+        return self.index.get(name, [])
+    
+    # sets the answers of one row and a value of None leaves that answer the same
+    def set_row(self, label_row, binary_answer_check = None, feasability = None):
+        new_answers = [label_row[2] if binary_answer_check is None else int(binary_answer_check), label_row[3] if feasability is None else int(feasability)]
+        if(new_answers != label_row[2:4]):
+            label_row[2:4] = new_answers
+            self.changes[label_row[0]] = new_answers
+            return True
+        return False
+    
+    # labels is a list of (name, binary answer check, feasability) and None leaves an answer the same
+    # like change_manual_answers only rows with a binary answer of 1 are changed unless only good is False
+    # returns the amount of rows changed and the names that weren't found
+    def update(self, labels = [], only_good = True):
+        changed_count = 0
+        missing_names = []
+        for name, binary_answer_check, feasability in labels:
+            label_rows = self.rows_for_name(name)
+            if(len(label_rows) == 0):
+                missing_names.append(name)
+            for label_row in label_rows:
+                if(only_good == False or label_row[1] == 1):
+                    changed_count += self.set_row(label_row, binary_answer_check, feasability)
+        return changed_count, missing_names
+    
+    # reads labels from a csv or excel file with Name, Binary Answer Check and Feasability columns (blank cells leave an answer the same)
+    def update_from_file(self, file = '', only_good = True):
+        if(file.endswith('.csv')):
+            labels_df = pd.read_csv(file)
+        else:
+            labels_df = pd.read_excel(file)
+        for column in ['Binary Answer Check', 'Feasability']:
+            if(column not in labels_df.columns):
+                labels_df[column] = None
+        labels_df = labels_df[['Name', 'Binary Answer Check', 'Feasability']].astype(object)
+        return self.update(labels_df.where(labels_df.notna(), None).values.tolist(), only_good)
+    
+    # writes only the changed rows and returns how many were written
+    def save(self):
+        if(len(self.changes) == 0):
+            return 0
+        if(self.store is not None):
+            self.store.set_manual_answers([(row, binary_answer_check, feasability) for row, (binary_answer_check, feasability) in self.changes.items()])
+        else:
+            sheet = self.workbook.active
+            for row, (binary_answer_check, feasability) in self.changes.items():
+                sheet.cell(row = row, column = self.cells[2] + 1, value = binary_answer_check)
+                sheet.cell(row = row, column = self.cells[3] + 1, value = feasability)
+            self.workbook.save(self.file)
+        changed_count = len(self.changes)
+        self.changes = {}
+        print('\nSaved ' + str(changed_count) + ' changed rows to:', self.file or self.store.file)
+        return changed_count
+
+# time series of every price seen for a product (deal news prices and every matched ebay listing) with rolling aggregates per normalized name
+# aggregates are recomputed for the names that get new prices so reading an estimate is usually a single primary key lookup
+# expires is when the oldest price of the aggregates leaves the window and expired aggregates are recomputed when the history is opened or read
+# kept in the product store's database file so the ML analysis can join the aggregates onto the products
+class PriceHistory():
+    
+    # window days is how far back prices count toward the aggregates
+    def __init__(self, file = '', window_days = 90):
+        self.file = file
+        self.window_seconds = window_days * 24 * 60 * 60
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(file, check_same_thread = False)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS price_points (name_key TEXT, source TEXT, price REAL, observed REAL)')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS price_points_name_key ON price_points (name_key, source, observed)')
+        self.connection.execute('CREATE TABLE IF NOT EXISTS price_names (name TEXT PRIMARY KEY, name_key TEXT)')
+        self.connection.execute('CREATE TABLE IF NOT EXISTS price_aggregates (name_key TEXT PRIMARY KEY, ebay_count INTEGER, ebay_min REAL, ebay_median REAL, ebay_volatility REAL, deal_news_count INTEGER, deal_news_last REAL, deal_news_trend REAL, updated REAL, expires REAL)')
+        
+        # aggregates saved before expires was added are recomputed right away
+        if('expires' not in [row[1] for row in self.connection.execute('PRAGMA table_info(price_aggregates)')]):
+            self.connection.execute('ALTER TABLE price_aggregates ADD COLUMN expires REAL DEFAULT 0')
+        self.connection.commit()
+        self.refresh_stale()
+    
+    # records prices for a product where source is deal news or ebay and observed is a timestamp (defaults to now)
+    # the aggregates for the product are updated in the same transaction
+    def record(self, name, source = 'ebay', prices = [], observed = None):
+        self.record_many([(name, source, prices, observed)])
+    
+    # records many (name, source, prices, observed) at once and updates the aggregates of each name once
+    def record_many(self, records = []):
+        now = time.time()
+        rows = []
+        names = {}
+        for name, source, prices, observed in records:
+            name_key = normalize_name(name)
+            names[name] = name_key
+            rows.extend([(name_key, source, float(price), observed or now) for price in prices if price is not None and price > 0])
+        with self.lock:
+            self.connection.executemany('INSERT INTO price_points VALUES (?, ?, ?, ?)', rows)
+            self.connection.executemany('INSERT OR IGNORE INTO price_names VALUES (?, ?)', list(names.items()))
+            for name_key in set(names.values()):
+                self.refresh(name_key, now)
+            self.connection.commit()
+    
+    # recomputes the rolling aggregates of one normalized name
+    # volatility is the standard deviation over the mean of the ebay prices and trend is the deal news price change per day
+    def refresh(self, name_key, now):
+        points = self.connection.execute('SELECT source, price, observed FROM price_points WHERE name_key = ? AND observed >= ?', (name_key, now - self.window_seconds)).fetchall()
+        ebay_prices = np.array([price for source, price, observed in points if source == 'ebay'])
+        deal_news_points = np.array([(observed, price) for source, price, observed in points if source == 'deal news']).reshape(-1, 2)
+        ebay_min, ebay_median, ebay_volatility = 0, 0, 0
+        if(len(ebay_prices) > 0):
+            ebay_min, ebay_median = ebay_prices.min(), np.median(ebay_prices)
+            ebay_volatility = ebay_prices.std() / ebay_prices.mean()
+        deal_news_last, deal_news_trend = 0, 0
+        if(len(deal_news_points) > 0):
+            deal_news_last = deal_news_points[deal_news_points[:, 0].argmax(), 1]
+            if(np.ptp(deal_news_points[:, 0]) > 0):
+                deal_news_trend = np.polyfit(deal_news_points[:, 0] / (24 * 60 * 60), deal_news_points[:, 1], 1)[0]
+        
+        # aggregates without prices in the window never expire (they're all 0 until the name gets new prices)
+        expires = None
+        if(len(points) > 0):
+            expires = min([observed for source, price, observed in points]) + self.window_seconds
+        self.connection.execute('INSERT OR REPLACE INTO price_aggregates VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', (name_key, len(ebay_prices), float(ebay_min), float(ebay_median), float(ebay_volatility), len(deal_news_points), float(deal_news_last), float(deal_news_trend), now, expires))
+    
+    # recomputes every aggregate that has a price that left the window and returns how many were recomputed
+    def refresh_stale(self):
+        now = time.time()
+        with self.lock:
+            name_keys = [row[0] for row in self.connection.execute('SELECT name_key FROM price_aggregates WHERE expires <= ?', (now,))]
+            for name_key in name_keys:
+                self.refresh(name_key, now)
+            self.connection.commit()
+        return len(name_keys)
+    
+    # aggregates of a product name as a dictionary or None if it has no prices (recomputed first if a price left the window)
+    def aggregates(self, name):
+        name_key = normalize_name(name)
+        now = time.time()
+        with self.lock:
+            cursor = self.connection.execute('SELECT * FROM price_aggregates WHERE name_key = ?', (name_key,))
+            row = cursor.fetchone()
+            if(row is None):
+                return None
+            aggregates = dict(zip([column[0] for column in cursor.description], row))
+            if(aggregates['expires'] is not None and aggregates['expires'] <= now):
+                self.refresh(name_key, now)
+                self.connection.commit()
+                cursor = self.connection.execute('SELECT * FROM price_aggregates WHERE name_key = ?', (name_key,))
+                aggregates = dict(zip([column[0] for column in cursor.description], cursor.fetchone()))
+        return aggregates
+    
+    # robust ebay price for a product from an aggregate column (ebay median or ebay min) or None without ebay history
+    def estimate(self, name, column = 'ebay_median'):
+        aggregates = self.aggregates(name)
+        if(aggregates is None or aggregates['ebay_count'] == 0):
+            return None
+        return aggregates[column]
+    
+    # values of the price aggregate columns for a product (0 without a history) so models trained with them can score products
+    def features(self, name):
+        aggregates = self.aggregates(name)
+        if(aggregates is None):
+            return [0, 0, 0]
+        return [aggregates['ebay_median'], aggregates['ebay_volatility'], aggregates['deal_news_trend']]
+    
+    # one time import of the prices already in the product store using when each product was added
+    # does nothing and returns 0 if the history already has prices
+    def import_store(self, store):
+        if(self.connection.execute('SELECT 1 FROM price_points LIMIT 1').fetchone() is not None):
+            return 0
+        rows = store.connection.execute('SELECT name, price, ebay_price, added FROM products').fetchall()
+        self.record_many([(name, 'deal news', [price], added) for name, price, ebay_price, added in rows] + [(name, 'ebay', [ebay_price], added) for name, price, ebay_price, added in rows])
+        return len(rows)
+    
+    def close(self):
+        self.connection.close()
+
+# ranks products by expected profit before the ebay lookup using past results and drops ones that can't reach the profit threshold
+# estimates are optimistic (a high quantile of past ebay to deal news price ratios) so only hopeless products are dropped
+class ProfitPrefilter():
+    
+    # history df has the excel columns and groups with fewer than min history rows aren't trusted (with no history nothing is dropped)
+    # there are no category ratios because a product's category is only known after its ebay lookup
+    # seconds per lookup is only used for the minutes saved until an ebay lookup has been timed
+    def __init__(self, history_df = pd.DataFrame(columns = excel_columns), profit_threshold = 45, fee_rate = .13, quantile = .9, min_history = 5, seconds_per_lookup = 10):
+        self.profit_threshold = profit_threshold
+        self.fee_rate = fee_rate
+        self.seconds_per_lookup = seconds_per_lookup
+        
+        # prices from the store can come back as objects when it's empty or has missing values
+        history_df = history_df.reindex(columns = excel_columns).astype({'Price': float, 'Ebay Price': float})
+        history_df = history_df[(history_df['Ebay Price'] > 0) & (history_df['Price'] > 0)]
+        ratios = history_df['Ebay Price'] / history_df['Price']
+        
+        # optimistic ebay price of products looked up at least min history times before
+        self.name_prices = self.group_ratios(history_df['Ebay Price'], history_df['Name'].map(normalize_name), quantile, min_history)
+        
+        # optimistic ratios by website and overall
+        self.website_ratios = self.group_ratios(ratios, history_df['Website'], quantile, min_history)
+        self.overall_ratio = float('inf')
+        if(len(ratios) >= min_history):
+            self.overall_ratio = ratios.quantile(quantile)
+            
+    # quantile of the values (prices or price ratios) for each group with enough history
+    def group_ratios(self, ratios, groups, quantile, min_history):
+        if(len(ratios) == 0):
+            return {}
+        grouped_ratios = ratios.groupby(groups)
+        group_sizes = grouped_ratios.size()
+        return grouped_ratios.quantile(quantile)[group_sizes >= min_history].to_dict()
+    
+    # optimistic ebay price using the most specific history available
+    def estimate_ebay_price(self, Product_obj):
+        name_key = normalize_name(Product_obj.name)
+        if(name_key in self.name_prices):
+            return self.name_prices[name_key]
+        if(Product_obj.website in self.website_ratios):
+            return Product_obj.price * self.website_ratios[Product_obj.website]
+        return Product_obj.price * self.overall_ratio
+    
+    # expected difference price the same way Product.fix_diff_price_and_binary_ans works it out
+    # the fee is taken off first so an infinite estimate (no history) stays infinite instead of becoming nan
+    def expected_profit(self, Product_obj):
+        ebay_price = self.estimate_ebay_price(Product_obj)
+        return ebay_price * (1 - self.fee_rate) - Product_obj.price
+    
+    # returns the products that could reach the profit threshold ranked by expected profit and the products dropped
+    def filter(self, product_list = []):
+        ranked_products = sorted([(self.expected_profit(Product_obj), Product_obj) for Product_obj in product_list], key = lambda x: x[0], reverse = True)
+        kept_products = [Product_obj for expected_profit, Product_obj in ranked_products if expected_profit >= self.profit_threshold]
+        dropped_products = [Product_obj for expected_profit, Product_obj in ranked_products if expected_profit < self.profit_threshold]
+        return kept_products, dropped_products
+
+# formats a price like deal news shows it ($new $old) so every deal source is validated with dn_product_check and fix_dn_price
+# a price that's already text with both prices (like $12.99 $25) is kept as it is
+def deal_news_price(price = None, old_price = None):
+    if(isinstance(price, str) and old_price is None):
+        return price
+    return ' '.join(['$' + str(value).replace('$', '').strip() for value in [price, old_price] if value is not None and value == value and str(value).strip() != ''])
+
+# a source of deals for the bulk loader that reads a local file or an http url
+# fields maps name, price, old price and website to the field names the source uses
+# subclasses parse a format (csv, json or rss) so a DealSource itself can't be created
+class DealSource(abc.ABC):
+    
+    def __init__(self, location = '', fields = {}, connection_pool = None):
+        self.location = location
+        self.fields = dict({'name': 'Name', 'price': 'Price', 'old_price': 'Old Price', 'website': 'Website'}, **fields)
+        self.connection_pool = connection_pool or ConnectionPool()
+    
+    # reads the file or url without blocking the other sources
+    async def read_text(self):
+        if(self.location.startswith('http://') or self.location.startswith('https://')):
+            status, text = await asyncio.to_thread(self.connection_pool.get, self.location)
+            if(status != 200):
+                raise ValueError(self.location + ' returned status ' + str(status))
+            return text
+        def read_file():
+            with open(self.location, encoding = 'utf-8') as f:
+                return f.read()
+        return await asyncio.to_thread(read_file)
+    
+    # turns the text of the source into a list of record dictionaries
+    @abc.abstractmethod
+    def parse(self, text):
+        pass
+    
+    # normalizes a record into a pending Product with a deal news style price
+    def product(self, record):
+        return Product(name = str(record.get(self.fields['name']) or '').strip(), price = deal_news_price(record.get(self.fields['price']), record.get(self.fields['old_price'])), website = str(record.get(self.fields['website']) or 'N/A').strip())
+    
+    # yields the source's deals as lists of Products of batch size
+    async def batches(self, batch_size = 1000):
+        text = await self.read_text()
+        records = await asyncio.to_thread(self.parse, text)
+        for start in range(0, len(records), batch_size):
+            yield [self.product(record) for record in records[start:start + batch_size]]
+            await asyncio.sleep(0)
+
+# csv dumps with a header row
+class CsvDealSource(DealSource):
+    
+    def parse(self, text):
+        return list(csv.DictReader(io.StringIO(text)))
+
+# json feeds that are a list of deals, an object with the list under items key or json lines (.jsonl files are always json lines)
+# an object without items key is a single deal (like a json lines file with one line)
+class JsonDealSource(DealSource):
+    
+    def __init__(self, location = '', fields = {}, connection_pool = None, items_key = 'items'):
+        super().__init__(location, fields, connection_pool)
+        self.items_key = items_key
+    
+    def parse(self, text):
+        if(os.path.splitext(urlparse(self.location).path)[1].lower() == '.jsonl'):
+            return [json.loads(line) for line in text.splitlines() if line.strip() != '']
+        try:
+            records = json.loads(text)
+        except json.JSONDecodeError:
+            return [json.loads(line) for line in text.splitlines() if line.strip() != '']
+        if(isinstance(records, dict)):
+            if(self.items_key in records):
+                return records[self.items_key]
+            return [records]
+        return records
+
+# rss feeds where prices are the first two dollar amounts of an item's title and description
+# the name is the title up to the price (like Apple AirPods Pro for $189) and the website is the item's source or the link's host
+class RssDealSource(DealSource):
+    
+    def parse(self, text):
+        import xml.etree.ElementTree as ElementTree
+        records = []
+        for item in ElementTree.fromstring(text).iter('item'):
+            title = (item.findtext('title') or '').strip()
+            prices = re.findall(r'\$[\d,]+(?:\.\d+)?', title + ' ' + (item.findtext('description') or ''))
+            website = item.findtext('source') or urlparse(item.findtext('link') or '').netloc.replace('www.', '')
+            records.append({self.fields['name']: re.split(r'\s+(?:for|at|from)\s+\$|\s+\$', title)[0], self.fields['price']: ' '.join(prices[:2]), self.fields['website']: website})
+        return records
+
+# picks the deal source for a file or url by its extension (.csv, .json, .jsonl, .rss or .xml)
+def deal_source(location = '', fields = {}, connection_pool = None):
+    extension = os.path.splitext(urlparse(location).path)[1].lower()
+    if(extension == '.csv'):
+        return CsvDealSource(location, fields, connection_pool)
+    if(extension in ['.rss', '.xml']):
+        return RssDealSource(location, fields, connection_pool)
+    return JsonDealSource(location, fields, connection_pool)
+
+# loads deals from many sources at the same time with asyncio and validates them in batches with the deal news rules (no prompts)
+# products are streamed out a batch at a time so ebay lookups can start before every source is read
+class BulkDealLoader():
+    
+    # scraper is used for validate_products and queue size is how many batches can wait for the ebay lookups
+    def __init__(self, sources = [], scraper = None, batch_size = 1000, queue_size = 100, stats = None):
+        self.sources = sources
+        self.scraper = scraper or Scraper()
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.stats = stats or RunStats()
+        self.seen = set()
+        self.errors = []
+    
+    # validates a batch and drops deals without a name and deals already loaded (same normalized name and price) from any source
+    def validate(self, product_list = []):
+        with self.stats.stage('feed validate'):
+            named_product_list = []
+            for Product_obj in product_list:
+                if(Product_obj.name == ''):
+                    Product_obj.status = 'rejected'
+                else:
+                    named_product_list.append(Product_obj)
+            valid_product_list = []
+            for Product_obj in self.scraper.validate_products(named_product_list):
+                key = (normalize_name(Product_obj.name), Product_obj.price)
+                if(key in self.seen):
+                    self.stats.count('feed duplicates')
+                    continue
+                self.seen.add(key)
+                valid_product_list.append(Product_obj)
+        self.stats.count('feed records', len(product_list))
+        self.stats.count('feed rejected', len(product_list) - len(named_product_list) + sum(1 for Product_obj in named_product_list if Product_obj.status == 'rejected'))
+        self.stats.count('feed products', len(valid_product_list))
+        return valid_product_list
+    
+    # loads one source and passes each validated batch to output (a failing source doesn't stop the others)
+    async def load_source(self, source, output):
+        try:
+            async for product_list in source.batches(self.batch_size):
+                valid_product_list = self.validate(product_list)
+                if(len(valid_product_list) > 0):
+                    await output(valid_product_list)
+        except Exception as e:
+            print(source.location + '  ERROR')
+            self.stats.record_error('feed', e)
+            self.errors.append(e)
+    
+    async def load_async(self, output):
+        await asyncio.gather(*[self.load_source(source, output) for source in self.sources])
+    
+    # loads every source and returns the valid products
+    def load(self):
+        product_list = []
+        async def output(valid_product_list):
+            product_list.extend(valid_product_list)
+        with self.stats.stage('feed load'):
+            asyncio.run(self.load_async(output))
+        return product_list
+    
+    # yields valid products while the sources are still loading (like iter_deal_news for run_pipeline)
+    def iter_products(self):
+        batch_queue = queue.Queue(maxsize = self.queue_size)
+        async def output(valid_product_list):
+            await asyncio.to_thread(batch_queue.put, valid_product_list)
+        def run():
+            try:
+                asyncio.run(self.load_async(output))
+            finally:
+                batch_queue.put(None)
+        thread = threading.Thread(target = run, daemon = True)
+        thread.start()
+        while(True):
+            product_list = batch_queue.get()
+            if(product_list is None):
+                break
+            for Product_obj in product_list:
+                yield Product_obj
+        thread.join()
+
+class Scraper():
+    
+    # class-wide variables except for the stats and wait policy which each scraper gets in the constructor
+    _browser = None
+    connection_pool = ConnectionPool()
+    ebay_cache = None
+    title_matcher = TitleMatcher()
+    model_scorer = None
+    price_history = None
+    price_estimate_column = None
+    profit_threshold = 45
+    fee_rate = .13
     product_list = []
     ebay_error_list = []
     deal_news_error_list = []
+    
+    # stats times the run and the wait policy (learned element wait times) records its timeouts and early exits in the same stats
+    def __init__(self, stats = None):
+        self.stats = stats or RunStats()
+        self.wait_policy = WaitPolicy(stats = self.stats)
        
+    # the browser is only started the first time it's used so commands that don't scrape never start chrome
+    @property
+    def browser(self):
+        if(self._browser is None):
+            self._browser = create_browser()
+        return self._browser
+    
+    # closes the browser if it was started
+    def close_browser(self):
+        if(self._browser is not None):
+            try:
+                self._browser.close()
+            except:
+                pass
+            self._browser = None
+    
     # turns scraped web elements into a usable list 
     def turn_list_to_text(self, list_passed):
         for i in range(0, len(list_passed)):
@@ -85,7 +1294,7 @@ class Scraper():
             while(len(products) - len(prices) != 6):
                 remove_product = input('Enter a product to remove or N to stop: ')
                 if(remove_product.upper() == 'N'):
-                    self.browser.close()
+                    self.close_browser()
                     raise ValueError("Accuracy check didn't pass.")
                 
                 # product entered not in products causes error
@@ -107,8 +1316,8 @@ class Scraper():
             raise ValueError("Accuracy check didn't pass.")
         print()
         
-    # scrapes the deal news website for deals
-    def scrape_deal_news(self, scrape_extra = False):
+    # gets the deal news urls to scrape and how far to scroll on each page
+    def deal_news_urls(self, scrape_extra = False):
         
         # list of deal news urls for other specific categories
         urls = ['https://www.dealnews.com/f1682/Staff-Pick/', 'https://www.dealnews.com/c202/Clothing-Accessories/', 'https://www.dealnews.com/c196/Home-Garden/', 'https://www.dealnews.com/c756/Health-Beauty/', 'https://www.dealnews.com/c142/Electronics/', 'https://www.dealnews.com/c39/Computers/', 'https://www.dealnews.com/c211/Sports-Fitness/', 'https://www.dealnews.com/c186/Gaming-Toys/', 'https://www.dealnews.com/c182/Office-School-Supplies/', 'https://www.dealnews.com/c238/Automotive/', 'https://www.dealnews.com/c178/Movies-Music-Books/']
@@ -120,40 +1329,77 @@ class Scraper():
         if(scrape_extra == False):
             scroll_length = 0
             urls = ['https://www.dealnews.com/']
+        return urls, scroll_length
+    
+    # scrapes one deal news page and returns the legit Product objects on it (prices aren't fixed yet)
+    # uses the Scraper browser unless another browser is passed
+    def scrape_deal_news_page(self, url, scroll_length = 0, scrape_extra = False, browser = None):
+        if(browser is None):
+            browser = self.browser
+                
+        # opens a browser
+        with self.stats.stage('deal news page load'):
+            browser.get(url) 
+            
+            # scrolls down the page to get some more deals (any larger of a number messes up the price scraping)
+            browser.execute_script("window.scrollTo(0, " + str(scroll_length) + ")")
+    
+        # scrapes prices, products, and websites (does a bit of filtering)          
+        with self.stats.stage('deal news wait'):
+            prices = self.wait_policy.wait_for_all(browser, By.CLASS_NAME, 'callout.limit-height.limit-height-large-1.limit-height-small-1')
+            self.turn_list_to_text(prices)
+            products = self.wait_policy.wait_for_all(browser, By.CLASS_NAME, 'title.limit-height.limit-height-large-2.limit-height-small-2')
+            self.turn_list_to_text(products)
+            websites = self.wait_policy.wait_for_all(browser, By.CLASS_NAME, 'key-attribute.limit-height.limit-height-large-1.limit-height-small-1')
+            self.turn_list_to_text(websites)
+            websites = [x.split()[0] for x in websites]
+        
+        # accuracy test for regular scrape
+        if(scrape_extra == False):
+            self.dn_accuracy_check(products, prices, websites)
+        else:
+            # accuracy test for scrape_extra = True because it's much simpler 
+            if(len(products) != len(prices) or len(prices) != len(websites) or len(websites) != len(products)):
+                return []
+            
+        # creates Product objects and keeps them if they are legit (uses method in Product class)
+        self.stats.count('deal news products', len(prices))
+        return [Product_obj for Product_obj in self.parse_products(products, prices, websites) if Product_obj.dn_product_check() == True]
+    
+    # creates a Product object for each scraped deal news product in one pass
+    def parse_products(self, products = [], prices = [], websites = []):
+        return [Product(name = name, price = price, website = website) for name, price, website in zip(products, prices, websites)]
+    
+    # fixes the prices of pending products in one pass and marks the ones that aren't legit as rejected
+    # returns the products that are still pending
+    def validate_products(self, product_list = []):
+        pending_products = []
+        for Product_obj in product_list:
+            
+            # very few prices don't meet formatting and these are unlikely to scrape on ebay anyways 
+            try:
+                if(Product_obj.dn_product_check() == False):
+                    raise ValueError('Deal news price is missing a new or old price')
+                Product_obj.fix_dn_price()
+                pending_products.append(Product_obj)
+            except:
+                Product_obj.status = 'rejected'
+        return pending_products
+    
+    # keeps only the products with a status in the product list
+    def keep_products_with_status(self, status = 'priced'):
+        self.product_list[:] = [Product_obj for Product_obj in self.product_list if Product_obj.status == status]
+    
+    # scrapes the deal news website for deals
+    def scrape_deal_news(self, scrape_extra = False):
+        urls, scroll_length = self.deal_news_urls(scrape_extra)
         
         # loops through urls
         for url in urls:
                 
             # error sometimes with tab crashing
             try:
-                
-                # opens a browser
-                self.browser.get(url) 
-                
-                # scrolls down the page to get some more deals (any larger of a number messes up the price scraping)
-                self.browser.execute_script("window.scrollTo(0, " + str(scroll_length) + ")")
-            
-                # scrapes prices, products, and websites (does a bit of filtering)          
-                prices = self.wait.until(EC.presence_of_all_elements_located((By.CLASS_NAME, 'callout.limit-height.limit-height-large-1.limit-height-small-1')))
-                self.turn_list_to_text(prices)
-                products = self.wait.until(EC.presence_of_all_elements_located((By.CLASS_NAME, 'title.limit-height.limit-height-large-2.limit-height-small-2')))
-                self.turn_list_to_text(products)
-                websites = self.wait.until(EC.presence_of_all_elements_located((By.CLASS_NAME, 'key-attribute.limit-height.limit-height-large-1.limit-height-small-1')))
-                self.turn_list_to_text(websites)
-                websites = [x.split()[0] for x in websites]
-                
-                # accuracy test for regular scrape
-                if(scrape_extra == False):
-                    self.dn_accuracy_check(products, prices, websites)
-                else:
-                    # accuracy test for scrape_extra = True because it's much simpler 
-                    if(len(products) != len(prices) or len(prices) != len(websites) or len(websites) != len(products)):
-                        continue
-                    
-                # creates Product objects and adds to list if they are legit (uses method in Product class)
-                for i in range(0,len(prices)):
-                    if(Product(name = products[i], price = prices[i], website = websites[i]).dn_product_check() == True):
-                        self.product_list.append(Product(name = products[i], price = prices[i], website = websites[i]))
+                self.product_list.extend(self.scrape_deal_news_page(url, scroll_length, scrape_extra))
             
             # prints url along with error
             except Exception as e:
@@ -161,128 +1407,402 @@ class Scraper():
                 self.deal_news_error_list.append(e)
         
         # fixes the price 
-        for Product_obj in self.product_list:
+        self.validate_products(self.product_list)
+        self.keep_products_with_status('pending')
+                
+    # scrapes every deal news category page at the same time with a pool of browsers (same as scrape extra = True)
+    # workers defaults to a browser per page so the scrape takes as long as the slowest page (fewer workers caps how many browsers are open)
+    # each url is retried with exponential backoff and a fresh browser and products are deduplicated by name, price and website
+    def scrape_deal_news_parallel(self, workers = None, retries = 2, backoff = 2):
+        urls, scroll_length = self.deal_news_urls(scrape_extra = True)
+        if(workers is None):
+            workers = len(urls)
+        worker_data = threading.local()
+        browsers = []
+        lock = threading.Lock()
+        
+        # each worker thread opens its own browser and replaces it if a page fails (like a crashed tab)
+        def scrape_url(url):
+            for attempt in range(0, retries + 1):
+                if(getattr(worker_data, 'browser', None) is None):
+                    worker_data.browser = create_browser()
+                    with lock:
+                        browsers.append(worker_data.browser)
+                try:
+                    return self.scrape_deal_news_page(url, scroll_length, scrape_extra = True, browser = worker_data.browser)
+                except Exception as e:
+                    self.stats.count('deal news retries')
+                    try:
+                        worker_data.browser.quit()
+                    except:
+                        pass
+                    worker_data.browser = None
+                    if(attempt == retries):
+                        print(url + '  ERROR\n\n')
+                        return e
+                    time.sleep(backoff * 2 ** attempt)
+        
+        # results come back in the same order as the urls
+        try:
+            with ThreadPoolExecutor(max_workers = workers) as executor:
+                results = list(executor.map(scrape_url, urls))
+        finally:
+            for browser in browsers:
+                try:
+                    browser.quit()
+                except:
+                    pass
+        
+        # merges the pages and drops products that showed up on more than one page
+        seen_products = set()
+        merged_product_list = []
+        for result in results:
+            if(isinstance(result, Exception)):
+                self.deal_news_error_list.append(result)
+                continue
+            for Product_obj in result:
+                product_key = (Product_obj.name, Product_obj.price, Product_obj.website)
+                if(product_key not in seen_products):
+                    seen_products.add(product_key)
+                    merged_product_list.append(Product_obj)
+        self.product_list.extend(self.validate_products(merged_product_list))
+                
+    # scrapes deal news one page at a time and yields each Product as soon as its page is parsed and its price is fixed
+    def iter_deal_news(self, scrape_extra = False):
+        urls, scroll_length = self.deal_news_urls(scrape_extra)
+        for url in urls:
             
-            # tries to get price but very few prices don't meet formatting and these are unlikely to scrape on ebay anyways 
+            # error sometimes with tab crashing
             try:
-                Product_obj.fix_dn_price()
-            except:
-                self.product_list.remove(Product_obj)
+                page_product_list = self.scrape_deal_news_page(url, scroll_length, scrape_extra)
+            except Exception as e:
+                print(url + '  ERROR\n\n')
+                self.deal_news_error_list.append(e)
+                continue
+            
+            # very few prices don't meet formatting and these are unlikely to scrape on ebay anyways 
+            for Product_obj in self.validate_products(page_product_list):
+                yield Product_obj
       
-    # scrapes ebay for products from deal news
-    def scrape_ebay(self):
+    # looks up one product on ebay using a session and fills in its ebay price, category and difference price
+    # returns False if ebay found no exact match and raises errors for products that should be disregarded
+    def lookup_ebay(self, Product_obj, session):
         
-        # opens initial browser and ensures it loads ebay because sometimes it gets invalid session ids
-        works = False
-        while(works == False):
-            try:
-                self.browser.get('https://www.ebay.com/') 
-                works = True
-            except:
-                pass
+        # uses cached results if the product was already looked up recently
+        if(self.ebay_cache is not None):
+            cached = self.ebay_cache.get(Product_obj.name)
+            if(cached is not None):
+                if(cached['found'] == False):
+                    return False
+                Product_obj.category = cached['category']
+                Product_obj.ebay_price = cached['ebay_price']
+                self.record_prices(Product_obj)
+                Product_obj.fix_diff_price_and_binary_ans(self.profit_threshold, self.fee_rate, self.ebay_price_estimate(Product_obj))
+                return True
         
-        # starts count and loops through Product object list
-        count = 0
-        for Product_obj in self.product_list:
-            
-            # catches errors for cannot determine loading status from target frame detached, buy it now and free shipping options, category of products, lowest price for product and ignores those products
-            try:
+        results = session.search(Product_obj.name)
+        if(results is None):
+            if(self.ebay_cache is not None):
+                self.ebay_cache.put(Product_obj.name, found = False)
+            return False
+        ebay_prices, ebay_names, category = results
+        Product_obj.category = category[1].split('\n')[0]
+    
+        # tries to determine lowest price for product and fixes product variables and if error disregard
+        # every matched price is kept in the price history instead of only the lowest one
+        with self.stats.stage('title matching'):
+            matched_prices = self.title_matcher.matched_prices([Product_obj.name], [(ebay_names, ebay_prices)])[0]
+        lowest_price = min(matched_prices, default = 0)
+        Product_obj.ebay_price = lowest_price
+        self.record_prices(Product_obj, matched_prices)
+        Product_obj.fix_diff_price_and_binary_ans(self.profit_threshold, self.fee_rate, self.ebay_price_estimate(Product_obj))
+        if(self.ebay_cache is not None):
+            self.ebay_cache.put(Product_obj.name, ebay_price = lowest_price, category = Product_obj.category, titles = ebay_names, prices = ebay_prices)
+        return True
+    
+    # records the deal news price and matched ebay prices of a product if there's a price history
+    def record_prices(self, Product_obj, ebay_prices = []):
+        if(self.price_history is not None):
+            with self.stats.stage('price history'):
+                self.price_history.record_many([(Product_obj.name, 'deal news', [Product_obj.price], None), (Product_obj.name, 'ebay', ebay_prices, None)])
+    
+    # ebay price from the price history aggregates (like the median of every matched listing seen) or None to use the lowest scraped price
+    def ebay_price_estimate(self, Product_obj):
+        if(self.price_history is None or self.price_estimate_column is None):
+            return None
+        return self.price_history.estimate(Product_obj.name, self.price_estimate_column)
+    
+    # creates an ebay session for a backend which is either selenium (browser) or http (no browser)
+    def create_ebay_session(self, backend = 'selenium', browser = None, rate_limiter = None):
+        if(backend == 'selenium'):
+            return EbaySession(browser = browser, rate_limiter = rate_limiter, stats = self.stats, wait_policy = self.wait_policy)
+        if(backend == 'http'):
+            return EbayHttpSession(connection_pool = self.connection_pool, rate_limiter = rate_limiter, stats = self.stats)
+        raise ValueError('Unknown ebay backend: ' + backend)
+    
+    # looks up a product on ebay and sets its status to priced, rejected (no exact match) or error and returns the status
+    def price_product(self, Product_obj, session):
+        
+        # catches errors for cannot determine loading status from target frame detached, buy it now and free shipping options, category of products, lowest price for product and ignores those products
+        try:
+            with self.stats.stage('ebay lookup'):
+                if(self.lookup_ebay(Product_obj, session)):
+                    Product_obj.status = 'priced'
+                else:
+                    Product_obj.status = 'rejected'
+        except Exception as e: 
+            Product_obj.status = 'error'
+            self.ebay_error_list.append(e)
+            print('ERROR')
+        self.stats.count('products')
+        self.stats.count(Product_obj.status + ' products')
+        return Product_obj.status
+    
+    # looks up every product on ebay in one pass with a session and returns the priced products
+    def price_products(self, product_list = [], session = None):
+        for count, Product_obj in enumerate(product_list, 1):
+            print(str(count) + '/' + str(len(product_list)))
+            self.price_product(Product_obj, session)
+        return [Product_obj for Product_obj in product_list if Product_obj.status == 'priced']
+    
+    # scrapes ebay for products from deal news and takes selenium or http as the backend
+    def scrape_ebay(self, backend = 'selenium'):
+        
+        # opens initial browser on ebay (the http backend doesn't need one)
+        browser = None
+        if(backend == 'selenium'):
+            browser = self.browser
+        session = self.create_ebay_session(backend, browser = browser)
+        session.open()
+        
+        # loops through Product object list and keeps the ones found on ebay (this is the hot path that can be profiled)
+        with self.stats.profile():
+            self.price_products(self.product_list, session)
+        self.keep_products_with_status('priced')
             
-                # increase count and print it
-                count += 1
-                print(str(count) + '/' + str(len(self.product_list)))
-                    
-                # enters Product name into search and enters could cause error 
-                self.browser.find_element(By.ID, "gh-ac").send_keys(Product_obj.name)
-                self.browser.find_element(By.ID, "gh-btn").click()
-                
-                # checks for the "no exact match found" and if it finds disregard product else keep going
+        # closes ebay browser when done (a session that restarted its browser owns the new one)
+        session.close()
+        self.close_browser()
+        self.export_error_data()
+        if(self.ebay_cache is not None):
+            self.ebay_cache.print_stats()
+        
+    # scrapes ebay with a pool of browsers that look up products at the same time
+    # workers is the concurrency limit and requests per second is the rate limit per host shared by all workers
+    def scrape_ebay_pooled(self, workers = 4, requests_per_second = 2, backend = 'selenium'):
+        rate_limiter = RateLimiter(requests_per_second)
+        worker_data = threading.local()
+        sessions = []
+        lock = threading.Lock()
+        count = [0]
+        
+        # each worker thread opens its own browser the first time it gets a product
+        # if the browser can't be opened the product is an error and the worker tries a new browser for its next product
+        def lookup(Product_obj):
+            if(getattr(worker_data, 'session', None) is None):
                 try:
-                    self.browser.find_element(By.CLASS_NAME, 'srp-save-null-search__heading')
-                    self.browser.get('https://www.ebay.com/') 
-                    self.product_list.remove(Product_obj)
-                    continue
-                except:
-                    pass
-                
-                # clicks the new option but needs try except for special cases 
+                    session = self.create_ebay_session(backend, rate_limiter = rate_limiter)
+                    with lock:
+                        sessions.append(session)
+                    session.open()
+                    worker_data.session = session
+                except Exception as e:
+                    Product_obj.status = 'error'
+                    self.ebay_error_list.append(e)
+                    self.stats.count('products')
+                    self.stats.count('error products')
+                    print('ERROR')
+                    return Product_obj.status
+            with lock:
+                count[0] += 1
+                print(str(count[0]) + '/' + str(len(self.product_list)))
+            return self.price_product(Product_obj, worker_data.session)
+        
+        try:
+            with ThreadPoolExecutor(max_workers = workers) as executor:
+                list(executor.map(lookup, self.product_list))
+        finally:
+            for session in sessions:
+                session.close()
+        
+        # keeps products that were found on ebay in their original order
+        self.keep_products_with_status('priced')
+        
+        # closes deal news browser when done 
+        self.close_browser()
+        self.export_error_data()
+        if(self.ebay_cache is not None):
+            self.ebay_cache.print_stats()
+    
+    # streams products into ebay lookups as they come in instead of waiting for the whole deal news scrape
+    # products is any iterable of Product objects (like iter_deal_news) and each priced product is saved to the checkpoint right away
+    # products already in the checkpoint are skipped so a restarted run resumes and the checkpoint is returned
+    # if a store is passed each priced product is also added to it
+    def run_pipeline(self, products = [], checkpoint_file = '', backend = 'http', workers = 4, requests_per_second = 2, queue_size = 100, store = None):
+        checkpoint = PipelineCheckpoint(checkpoint_file)
+        resumed_product_list = checkpoint.priced_products()
+        self.product_list.extend(resumed_product_list)
+        if(len(resumed_product_list) > 0):
+            print('Resuming with ' + str(len(resumed_product_list)) + ' products from the checkpoint')
+        
+        product_queue = queue.Queue(maxsize = queue_size)
+        rate_limiter = RateLimiter(requests_per_second)
+        lock = threading.Lock()
+        count = [0]
+        producer_errors = []
+        consumer_errors = []
+        running_consumers = [workers]
+        stop = threading.Event()
+        
+        # puts an item in the queue unless every worker has stopped (so a full queue can't block forever) and returns whether it was put
+        def put(item):
+            while(stop.is_set() == False):
                 try:
-                    self.browser.find_element(By.PARTIAL_LINK_TEXT, "New").click()
-                except:
+                    product_queue.put(item, timeout = .1)
+                    return True
+                except queue.Full:
                     pass
-                
-                # tries to click buy it now and free shipping options else likely not a good product so causes error
-                self.browser.find_element(By.PARTIAL_LINK_TEXT, "Buy It Now").click()
-                self.browser.find_element(By.LINK_TEXT, "Free Shipping").click()
-                    
-                # scrapes ebay prices and names 
-                ebay_prices = self.wait.until(EC.presence_of_all_elements_located((By.CLASS_NAME, 's-item__price')))
-                self.turn_list_to_text(ebay_prices)
-                ebay_names = self.wait.until(EC.presence_of_all_elements_located((By.CLASS_NAME, 's-item__title')))
-                self.turn_list_to_text(ebay_names)
-                
-                # tries to scrape category of product but if it can't find disregard the product because in later steps it will be removed
-                category = self.wait.until(EC.presence_of_all_elements_located((By.CLASS_NAME, 'srp-refine__category__item')))
-                self.turn_list_to_text(category)
-                Product_obj.category = category[1].split('\n')[0]
-                
-                # if scraped less than desired search length then make search len the scrape len
-                if(len(ebay_prices)<5):
-                    search_len = len(ebay_prices)
-                else:
-                    search_len = 5
-            
-                # tries to determine lowest price for product and fixes product variables and if error disregard
-                # different Levenshtein standard for first item found and if not met set arbitrarily high lowest price
-                if(Levenshtein.ratio(Product_obj.name, ebay_names[1]) > .4):
-                    lowest_price = float(ebay_prices[1].replace('$', '').split()[0])
-                else:
-                    lowest_price = 10000
-                   
-                # for all other checked ebay prices 
-                for i in range(2, search_len):
-                    if(Levenshtein.ratio(Product_obj.name, ebay_names[i]) > .6 and float(ebay_prices[i].replace('$', '').split()[0]) < lowest_price):
-                        lowest_price = float(ebay_prices[i].replace('$', '').split()[0])
+            return False
+        
+        # reads products from the source into the queue and then tells each worker to stop
+        def produce():
+            try:
+                for Product_obj in products:
+                    if(checkpoint.is_done(Product_obj) == False and put(Product_obj) == False):
+                        break
+            except Exception as e:
+                producer_errors.append(e)
+            finally:
+                for i in range(0, workers):
+                    put(None)
+        
+        # looks up products on ebay as soon as they're queued and saves the results one at a time
+        # an error that stops a worker is saved and the producer stops once no workers are left
+        def consume():
+            session = None
+            try:
+                session = self.create_ebay_session(backend, rate_limiter = rate_limiter)
+                session.open()
+                while(True):
+                    Product_obj = product_queue.get()
+                    if(Product_obj is None):
+                        break
+                    with lock:
+                        count[0] += 1
+                        print(str(count[0]) + ' looked up')
                     
-                # fixes price and binary answer and if price is still arbitrarily high set it back to 0
-                if(lowest_price == 10000):
-                    lowest_price = 0
-                Product_obj.ebay_price = lowest_price
-                Product_obj.fix_diff_price_and_binary_ans()
-                
-                # resets browser for next product
-                self.browser.get('https://www.ebay.com/') 
-    
-            # print exceptions, remove product, and goes to next loop
-            except Exception as e: 
-                self.product_list.remove(Product_obj)
-                self.ebay_error_list.append(e)
-                print('ERROR')
-                continue
-            
-        # closes ebay browser when done 
-        self.browser.close()
+                    # errors aren't saved so the product is tried again if the run is restarted
+                    status = self.price_product(Product_obj, session)
+                    if(status == 'rejected'):
+                        checkpoint.append(Product_obj, status = 'no match')
+                    if(status != 'priced'):
+                        continue
+                    checkpoint.append(Product_obj, status = 'priced')
+                    if(store is not None):
+                        store.add_products([Product_obj])
+                    with lock:
+                        self.product_list.append(Product_obj)
+            except Exception as e:
+                consumer_errors.append(e)
+            finally:
+                if(session is not None):
+                    session.close()
+                with lock:
+                    running_consumers[0] -= 1
+                    if(running_consumers[0] == 0):
+                        stop.set()
         
-        # export dataframe of errors from scraping 
+        threads = [threading.Thread(target = produce)] + [threading.Thread(target = consume) for i in range(0, workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if(len(producer_errors) > 0):
+            raise producer_errors[0]
+        if(len(consumer_errors) > 0):
+            raise consumer_errors[0]
+        
+        # closes deal news browser when done 
+        self.close_browser()
+        self.export_error_data()
+        if(self.ebay_cache is not None):
+            self.ebay_cache.print_stats()
+        return checkpoint
+    
+    # export dataframe of errors from scraping 
+    def export_error_data(self):
         error_df = pd.DataFrame(columns = ['Ebay Errors'])
         error_df['Ebay Errors'] = self.ebay_error_list
         error_df = pd.concat([error_df, pd.DataFrame({'Deal News Errors': self.deal_news_error_list})], axis = 1)
-        error_df.to_excel('C:/Computer Science/Deal News and Ebay Project/Scraping Error Data.xlsx', index = False) 
+        error_df.to_excel(project_file('Scraping Error Data.xlsx'), index = False) 
      
-    # outputs results in a presentable manner
+    # scores the whole product list at once with a saved model and returns the probabilities of being a good product
+    # rows have the price aggregate columns too (0 without a price history) for models trained with them
+    def predict(self, scorer = None, product_list = None):
+        if(product_list is None):
+            product_list = self.product_list
+        if(self.price_history is None):
+            rows = [Product_obj.excel_format() + [0, 0, 0] for Product_obj in product_list]
+        else:
+            rows = [Product_obj.excel_format() + self.price_history.features(Product_obj.name) for Product_obj in product_list]
+        return scorer.predict(rows, excel_columns + price_aggregate_columns)
+    
+    # drops products that can't reach the profit threshold before the ebay lookup and orders the rest by expected profit
+    # the minutes saved use the measured time of an ebay lookup (see seconds_per_lookup) and the prefilter's guess only before any lookup was ever timed
+    def prefilter_products(self, prefilter = None, report_file = ''):
+        kept_products, dropped_products = prefilter.filter(self.product_list)
+        for Product_obj in dropped_products:
+            Product_obj.status = 'rejected'
+        self.product_list[:] = kept_products
+        self.stats.count('prefiltered products', len(dropped_products))
+        seconds_per_lookup = self.seconds_per_lookup(report_file)
+        if(seconds_per_lookup is None):
+            seconds_per_lookup = prefilter.seconds_per_lookup
+        print('\nSkipping ' + str(len(dropped_products)) + ' ebay lookups that could never reach the profit threshold (about ' + str(round(len(dropped_products) * seconds_per_lookup / 60, 1)) + ' minutes saved)')
+    
+    # mean seconds of the ebay lookups timed in this run or else in the last run report or None if neither has any
+    def seconds_per_lookup(self, report_file = ''):
+        lookup_timings = self.stats.timings.get('ebay lookup', [])
+        if(len(lookup_timings) > 0):
+            return sum(lookup_timings) / len(lookup_timings)
+        if(report_file == '' or os.path.exists(report_file) == False):
+            return None
+        try:
+            with open(report_file) as f:
+                return json.load(f)['stages']['ebay lookup']['mean']
+        except (ValueError, KeyError):
+            return None
+    
+    # skips ebay lookups for products that a model trained only on deal news data confidently rejects
+    def skip_rejected_products(self, scorer = None, threshold = .05):
+        probabilities = self.predict(scorer)
+        for Product_obj, probability in zip(self.product_list, probabilities):
+            if(probability < threshold):
+                Product_obj.status = 'rejected'
+        print('\nSkipping ' + str(sum(probabilities < threshold)) + ' ebay lookups for products the model rejected')
+        self.keep_products_with_status('pending')
+        
+    # outputs results in a presentable manner (with model probabilities if there's a model scorer)
     def show_results(self):
+        probabilities = [None] * len(self.product_list)
+        if(self.model_scorer is not None):
+            probabilities = self.predict(self.model_scorer)
         good_products = []
-        for Product_obj in self.product_list:
+        for Product_obj, probability in zip(self.product_list, probabilities):
             if(Product_obj.binary_answer == 1):
-                good_products.append(Product_obj)
+                good_products.append((Product_obj, probability))
             else:
                 print(Product_obj)
+                if(probability is not None):
+                    print('Model Probability: ' + str(round(probability, 2)))
         if(len(good_products) == 0):
             print('\nTHERE WERE NO GOOD PRODUCT(S)')
         else:
             print('\nGOOD PRODUCT(S)')
-            for good_product in good_products:
+            for good_product, probability in good_products:
                 print(good_product)
+                if(probability is not None):
+                    print('Model Probability: ' + str(round(probability, 2)))
             
     # exports to excel         
     def export_to_excel(self, file = ''):
@@ -290,62 +1810,183 @@ class Scraper():
         # makes sure user is active when exporting so data isn't added with answers being manually checked
         excel_input = input("Would you like to export to Excel? Y or N: ")
         if(excel_input == 'Y'):
-        
-            # creates a dataframe out of scraped products
-            product_df = pd.DataFrame(columns = ['Name', 'Price', 'Old Price', 'Website', 'Ebay Price', 'Category', 'Difference Price', 'Binary Answer', 'Binary Answer Check', 'Feasability'])
-            for Product_obj in self.product_list:
-                product_df.loc[len(product_df.index)] = Product_obj.excel_format()
-            
-            # tries to download current file and check for duplicate products
-            try:
-                current_product_df = pd.read_excel(file)
-                combined_product_df = current_product_df.append(product_df)
-                combined_product_df = combined_product_df.drop_duplicates(subset = ['Name', 'Price', 'Binary Answer'])
-                print('\n' + str(len(combined_product_df) - len(current_product_df)) + ' New Products Added')
-            except:
-                print("\nCouldn't Find File")
-                combined_product_df = product_df
-            
-            # drop rows that are empty
-            combined_product_df.drop(combined_product_df.index[combined_product_df['Category'] == ''], inplace = True)
-            combined_product_df.drop(combined_product_df.index[combined_product_df['Ebay Price'] == 0], inplace = True)
-            
-            # saves as an excel file 
-            combined_product_df.to_excel(file, index = False) 
-            print('\nSuccessfully exported to:', file)
+            self.write_excel(file)
     
-    # used to change the manual answer columns
-    def change_manual_answers(self, file = ''):
+    # adds the scraped products to the excel file without asking (used by export to excel and the benchmarks)
+    def write_excel(self, file = ''):
+        
+        # creates a dataframe out of scraped products
+        product_df = pd.DataFrame([Product_obj.excel_format() for Product_obj in self.product_list], columns = excel_columns)
         
-        # tries to close the browser if open
+        # tries to download current file and check for duplicate products
         try:
-            self.browser.close()
+            with self.stats.stage('excel read'):
+                current_product_df = pd.read_excel(file)
+            combined_product_df = pd.concat([current_product_df, product_df])
+            combined_product_df = combined_product_df.drop_duplicates(subset = ['Name', 'Price', 'Binary Answer'])
+            print('\n' + str(len(combined_product_df) - len(current_product_df)) + ' New Products Added')
         except:
-            pass
+            print("\nCouldn't Find File")
+            combined_product_df = product_df
+        
+        # drop rows that are empty
+        combined_product_df.drop(combined_product_df.index[combined_product_df['Category'] == ''], inplace = True)
+        combined_product_df.drop(combined_product_df.index[combined_product_df['Ebay Price'] == 0], inplace = True)
+        
+        # saves as an excel file 
+        with self.stats.stage('excel write'):
+            combined_product_df.to_excel(file, index = False) 
+        print('\nSuccessfully exported to:', file)
+    
+    # adds products to the product store where duplicates are skipped on insert
+    def export_to_store(self, store):
+        with self.stats.stage('store export'):
+            added_count = store.add_products(self.product_list)
+        print('\n' + str(added_count) + ' New Products Added')
+        print('\nSuccessfully exported to:', store.file)
+    
+    # used to change the manual answer columns one product at a time
+    # if a product store is passed the answers are changed in it instead of the excel file
+    # for many products at once use LabelEditor.update_from_file instead
+    def change_manual_answers(self, file = '', store = None):
         
-        # reads in the current data
-        current_product_df = pd.read_excel(file)
+        # closes the browser if open
+        self.close_browser()
         
         # asks for input for products and then checks binary answer is 1 before potentially changing manual answers 
+        label_editor = LabelEditor(file, store)
         product_input = ''
         while(product_input.upper() != 'N'):
             product_input = input('Enter product or N to stop: ')
-            row_index_list = current_product_df.index[current_product_df['Name'] == product_input].tolist()
-            for row_index in row_index_list:
-                if(current_product_df.at[row_index, 'Binary Answer'] == 1):
+            for label_row in label_editor.rows_for_name(product_input):
+                if(label_row[1] == 1):
                     if(input("Would you like to change Binary Answer Check? Enter Y or N: ").upper() == 'Y'): 
-                        current_product_df.at[row_index, 'Binary Answer Check'] = 1
+                        label_editor.set_row(label_row, binary_answer_check = 1)
                         print('\nChanged Binary Answer Check for', product_input)
                     if(input("Would you like to change Feasability? Enter Y or N: ").upper() == 'Y'): 
-                        current_product_df.at[row_index, 'Feasability'] = 1
+                        label_editor.set_row(label_row, feasability = 1)
                         print('\nChanged Feasability for', product_input)
         
-        # saves as an excel file
-        current_product_df.to_excel(file, index = False) 
-        print('\nSuccessfully exported to:', file)
+        # saves only the changed rows
+        label_editor.save()
+        
+# times scraping saved ebay results pages (.html files in fixture dir) with the http backend parser
+# if compare selenium is True the same pages are also loaded and scraped in a browser for comparison
+def benchmark_ebay_backends(fixture_dir = '', compare_selenium = False):
+    fixture_files = sorted(glob.glob(os.path.join(fixture_dir, '*.html')))
+    if(len(fixture_files) == 0):
+        print('No html fixtures found in', fixture_dir)
+        return
+    
+    # http backend parsing
+    session = EbayHttpSession()
+    start = time.perf_counter()
+    for fixture_file in fixture_files:
+        with open(fixture_file, encoding = 'utf-8') as f:
+            try:
+                session.parse_results(f.read())
+            except ValueError:
+                pass
+    http_time = (time.perf_counter() - start) / len(fixture_files)
+    # html.parser is pure python so it needs nothing installed but takes about half a second on a 1 MB results page (lxml would be several times faster)
+    print('HTTP parser (html.parser): ' + str(round(http_time * 1000, 2)) + ' ms per page')
+    
+    # selenium loading and scraping the same pages
+    if(compare_selenium):
+        browser = create_browser()
+        start = time.perf_counter()
+        for fixture_file in fixture_files:
+            browser.get('file:///' + os.path.abspath(fixture_file).replace('\\', '/'))
+            for class_name in ['s-item__price', 's-item__title', 'srp-refine__category__item']:
+                [x.text for x in browser.find_elements(By.CLASS_NAME, class_name)]
+        selenium_time = (time.perf_counter() - start) / len(fixture_files)
+        browser.quit()
+        print('Selenium: ' + str(round(selenium_time * 1000, 2)) + ' ms per page (' + str(round(selenium_time / http_time, 1)) + 'x slower)')
+
+# compares scoring titles one Levenshtein.ratio call at a time against the vectorized TitleMatcher
+# uses random titles with a number of products each with a page of listings
+def benchmark_title_matching(products = 200, listings = 50, method = 'ratio'):
+    words = ['apple', 'samsung', 'wireless', 'bluetooth', 'headphones', 'laptop', '15.6"', 'gaming', 'mouse', 'keyboard', 'usb-c', 'charger', '4k', 'tv', 'smart', 'watch', 'black', 'pro', 'max', '256gb', 'ssd', 'monitor', 'camera', 'speaker']
+    random.seed(22)
+    names = [' '.join(random.sample(words, 6)) for i in range(0, products)]
+    titles = [' '.join(random.sample(words, 8)) for i in range(0, listings)]
+    
+    # current approach with a ratio call per pair
+    start = time.perf_counter()
+    for name in names:
+        for title in titles:
+            Levenshtein.ratio(name, title)
+    loop_time = time.perf_counter() - start
+    
+    # one call for all pairs
+    start = time.perf_counter()
+    TitleMatcher(method = method).score(names, titles)
+    batch_time = time.perf_counter() - start
+    
+    print('Levenshtein loop: ' + str(round(loop_time * 1000, 2)) + ' ms for ' + str(products * listings) + ' pairs')
+    print('TitleMatcher (' + method + '): ' + str(round(batch_time * 1000, 2)) + ' ms (' + str(round(loop_time / max(batch_time, 1e-9), 1)) + 'x faster)')
+
+# benchmarks the ebay lookup, title matching, profit prefilter and excel export offline and saves the results as json to compare revisions
+# ebay searches go to a local stub server that replays the recorded pages in fixture dir (or generated pages if there are none)
+# product histories of each row count are generated with the shape of the template file
+def benchmark_suite(fixture_dir = '', template_file = '', row_counts = [1000, 10000, 100000], products = 200, file = ''):
+    from bench_fixtures import Benchmark, StubServer, synthetic_history, ebay_results_page
+    benchmark = Benchmark()
+    Scraper_obj = Scraper()
+    sample_df = synthetic_history(products, template_file, seed = 7)
+    product_list = [Product(name, price, old_price, website) for name, price, old_price, website in sample_df[['Name', 'Price', 'Old Price', 'Website']].itertuples(index = False)]
+    
+    # full ebay lookups with the http backend
+    with StubServer(fixture_dir) as server:
+        session = EbayHttpSession(stats = Scraper_obj.stats, base_url = server.url())
+        benchmark.run('ebay lookup', lambda Product_obj: Scraper_obj.price_product(Product_obj, session), product_list)
+    
+    # title matching and parsing on their own
+    pages = [ebay_results_page(Product_obj.name) for Product_obj in product_list]
+    benchmark.run('ebay parse', session.parse_results, pages)
+    page_results = [(Product_obj.name, session.parse_results(page)) for Product_obj, page in zip(product_list, pages)]
+    benchmark.run('title matching', lambda page_result: Scraper_obj.title_matcher.lowest_price(page_result[0], page_result[1][1], page_result[1][0]), page_results)
+    
+    Scraper_obj.product_list = [Product_obj for Product_obj in product_list if Product_obj.status == 'priced']
+    excel_file = os.path.join(os.path.dirname(os.path.abspath(file)), 'Benchmark History.xlsx')
+    for row_count in row_counts:
+        history_df = synthetic_history(row_count, template_file)
+        benchmark.run('prefilter ' + str(row_count) + ' rows', lambda df: ProfitPrefilter(df).filter(product_list), [history_df], row_count)
         
-# modifies a dataframe that is read in
-def modify_dataframe(file = ''):
+        # the history file is written before timing so only the export is measured
+        history_df.to_excel(excel_file, index = False)
+        benchmark.run('excel export ' + str(row_count) + ' rows', Scraper_obj.write_excel, [excel_file], row_count)
+    os.remove(excel_file)
+    benchmark.write(file)
+    return benchmark.results
+
+# benchmarks loading deals from a local csv file and json and rss feeds on a stub server at the same time and saves the results as json
+# deals are generated with the shape of the template file and rows is how many deals each source has
+def benchmark_deal_feeds(template_file = '', rows = 100000, file = ''):
+    from bench_fixtures import Benchmark, StubServer, synthetic_history, deal_feeds
+    benchmark = Benchmark()
+    csv_text, json_text, rss_text = deal_feeds(synthetic_history(rows, template_file))
+    csv_file = os.path.join(os.path.dirname(os.path.abspath(file)), 'Benchmark Deals.csv')
+    with open(csv_file, 'w', encoding = 'utf-8') as f:
+        f.write(csv_text)
+    with StubServer(routes = {'/deals.json': ('application/json', json_text), '/deals.rss': ('application/rss+xml', rss_text)}) as server:
+        sources = [CsvDealSource(csv_file), JsonDealSource(server.url() + '/deals.json', fields = {'name': 'title', 'price': 'price', 'old_price': 'list_price', 'website': 'store'}), RssDealSource(server.url() + '/deals.rss')]
+        for source in sources:
+            benchmark.run('feed load ' + type(source).__name__, lambda source: BulkDealLoader([source]).load(), [source], rows)
+        loader = BulkDealLoader(sources)
+        benchmark.run('feed load all sources', lambda loader: loader.load(), [loader], rows * len(sources))
+    os.remove(csv_file)
+    print('Loaded ' + str(loader.stats.counters['feed products']) + ' of ' + str(loader.stats.counters['feed records']) + ' deals (' + str(loader.stats.counters['feed duplicates']) + ' duplicates across sources)')
+    benchmark.write(file)
+    return benchmark.results
+
+# modifies a dataframe that is read in (or the product store if one is passed)
+def modify_dataframe(file = '', store = None):
+    
+    # drop rows that are empty without rewriting anything else
+    if(store is not None):
+        store.drop_empty_rows()
+        return
     
     # reads in dataframe
     df = pd.read_excel(file)
@@ -362,13 +2003,56 @@ def modify_dataframe(file = ''):
         
 def main():
     
-    Scraper_obj = Scraper()
+    # times each stage of the run and takes a file to dump a cProfile of the ebay lookups as a parameter (None to not profile)
+    Scraper_obj = Scraper(stats = RunStats(profile_file = None))
+    
+    # stores products in sqlite and takes file as a parameter (the existing excel file is imported the first time)
+    store = ProductStore(file = project_file('Deal News and Ebay Scraper Data.db'))
+    if(store.count() == 0):
+        store.import_excel(file = project_file('Deal News and Ebay Scraper Data.xlsx'))
+    
+    # title matching that takes method (ratio or token_set), amount of ebay results checked and Levenshtein thresholds as parameters
+    Scraper_obj.title_matcher = TitleMatcher(method = 'ratio', depth = 5, first_threshold = .4, threshold = .6)
+    
+    # caches ebay results between runs and takes file, days results stay valid and max entries as parameters
+    Scraper_obj.ebay_cache = EbayCache(file = project_file('Ebay Cache.db'), ttl_days = 7, max_entries = 10000)
+    
+    # keeps every deal news and matched ebay price with rolling aggregates per product and takes file and days of prices used as parameters
+    # price estimate column (ebay_median or ebay_min) sets the difference price from the history instead of the single lowest listing (None to not)
+    # import store fills an empty history with the prices already in the product store
+    #Scraper_obj.price_history = PriceHistory(file = project_file('Deal News and Ebay Scraper Data.db'), window_days = 90)
+    #Scraper_obj.price_history.import_store(store)
+    #Scraper_obj.price_estimate_column = 'ebay_median'
+    
+    # scores products with the newest model saved by the ML analysis and takes directory and model name as parameters
+    #Scraper_obj.model_scorer = ModelScorer(directory = project_file('Models'), name = 'Product Resell Model')
     
     # parameter is scrape extra which can be set to True or False
     Scraper_obj.scrape_deal_news(scrape_extra = True)
     
-    # scrapes ebay no parameters needed
-    Scraper_obj.scrape_ebay()
+    # scrapes all of the deal news category pages at the same time and takes amount of browsers (None for one per page), retries per page and backoff seconds as parameters
+    #Scraper_obj.scrape_deal_news_parallel(workers = None, retries = 2, backoff = 2)
+    
+    # drops products that past results say can't reach the profit threshold and takes history, profit threshold and fee rate as parameters
+    # the last run report gives how long an ebay lookup takes for the minutes saved
+    Scraper_obj.prefilter_products(ProfitPrefilter(store.to_dataframe(), profit_threshold = Scraper_obj.profit_threshold, fee_rate = Scraper_obj.fee_rate), report_file = project_file('Run Report.json'))
+    
+    # skips ebay lookups for products the pre lookup model rejects and takes the model and lowest probability kept as parameters
+    #Scraper_obj.skip_rejected_products(ModelScorer(directory = project_file('Models'), name = 'Pre Lookup Model'), threshold = .05)
+    
+    # instead of scraping deal news and then ebay this streams each deal news product straight into an ebay lookup
+    # takes the products, checkpoint file (an interrupted run resumes from it), ebay backend and amount of workers as parameters
+    #checkpoint = Scraper_obj.run_pipeline(Scraper_obj.iter_deal_news(scrape_extra = True), checkpoint_file = project_file('Pipeline Checkpoint.jsonl'), backend = 'http', workers = 4, store = store)
+    
+    # loads deals from csv files and json or rss feeds (local files or urls) at the same time and streams them into the ebay lookups without prompts
+    # takes the sources (deal_source picks the type by extension and fields maps the source's field names) and the same pipeline parameters as above
+    #checkpoint = Scraper_obj.run_pipeline(BulkDealLoader([deal_source(project_file('Partner Deals.csv')), deal_source('https://example.com/deals.rss')], Scraper_obj).iter_products(), checkpoint_file = project_file('Pipeline Checkpoint.jsonl'), backend = 'http', workers = 4, store = store)
+    
+    # scrapes ebay and takes the backend which is selenium or http (no browser) as a parameter
+    Scraper_obj.scrape_ebay(backend = 'selenium')
+    
+    # scrapes ebay with multiple sessions and takes the amount of sessions, requests per second per host and backend as parameters
+    #Scraper_obj.scrape_ebay_pooled(workers = 4, requests_per_second = 2, backend = 'http')
     
     # outputs scraped results 
     Scraper_obj.show_results()
@@ -376,13 +2060,198 @@ def main():
     # prints how many errors during ebay scraping
     print('\nThere were ' + str(len(Scraper_obj.ebay_error_list)) + ' errors during ebay scraping')
     
+    # adds products to the product store
+    Scraper_obj.export_to_store(store)
+    
     # exports to excel and takes file as a parameter 
-    Scraper_obj.export_to_excel(file = 'C:/Computer Science/Deal News and Ebay Project/Deal News and Ebay Scraper Data.xlsx')
+    #Scraper_obj.export_to_excel(file = project_file('Deal News and Ebay Scraper Data.xlsx'))
+    
+    # writes the timings, counters and errors of the run as json and csv and takes file as a parameter
+    Scraper_obj.stats.write_report(file = project_file('Run Report.json'))
+    
+    # deletes the pipeline checkpoint once its products are exported
+    #checkpoint.clear()
+    
+    # allows to change the manual answer columns and takes file or product store as a parameter
+    Scraper_obj.change_manual_answers(store = store)
+    
+    # changes the manual answers of many products at once from a csv or excel file of Name, Binary Answer Check and Feasability (no browser needed)
+    #label_editor = LabelEditor(store = store)
+    #print(label_editor.update_from_file(file = project_file('Labels.csv')))
+    #label_editor.save()
+
+    # modifies dataframe and takes file or product store as a parameter
+    #modify_dataframe(store = store)
+    
+    # exports the product store to excel only when wanted and takes file as a parameter
+    #store.export_excel(file = project_file('Deal News and Ebay Scraper Data.xlsx'))
+    
+    # benchmarks batch title matching against Levenshtein.ratio calls and takes amount of products and listings as parameters
+    #benchmark_title_matching(products = 200, listings = 50, method = 'token_set')
     
-    # allows to change the manual answer columns and takes file as a parameter
-    Scraper_obj.change_manual_answers(file = 'C:/Computer Science/Deal News and Ebay Project/Deal News and Ebay Scraper Data.xlsx')
+    # benchmarks the http backend on saved ebay results pages and takes the folder of pages as a parameter
+    #benchmark_ebay_backends(fixture_dir = project_file('Ebay Fixtures'), compare_selenium = True)
+    
+    # offline benchmarks of each stage against a stub ebay server and generated histories and takes the folder of pages, template file, history sizes and results file as parameters
+    # bench_fixtures.compare_benchmarks(old_file, new_file) compares the results of two revisions
+    #benchmark_suite(fixture_dir = project_file('Ebay Fixtures'), template_file = project_file('Deal News and Ebay Scraper Data.xlsx'), row_counts = [1000, 10000, 100000], file = project_file('Scraper Benchmark.json'))
+    
+    # benchmarks loading deals from a csv file and json and rss feeds on a stub server and takes the template file, deals per source and results file as parameters
+    #benchmark_deal_feeds(template_file = project_file('Deal News and Ebay Scraper Data.xlsx'), rows = 100000, file = project_file('Feed Benchmark.json'))
+
+# loads the ML analysis script as a module (only the train command needs it and its libraries)
+def load_ml_analysis():
+    import importlib.util
+    spec = importlib.util.spec_from_file_location('product_resell_ml_analysis', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Product Resell ML Analysis.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+# reads products from a csv or excel file with the excel columns (only Name, Price, Old Price and Website are needed)
+def read_product_file(file = ''):
+    if(file.endswith('.csv')):
+        df = pd.read_csv(file)
+    else:
+        df = pd.read_excel(file)
+    defaults = Product().excel_format()
+    for i, column in enumerate(excel_columns):
+        if(column not in df.columns):
+            df[column] = defaults[i]
+    return [Product(*row) for row in df[excel_columns].astype(object).where(df[excel_columns].notna(), None).values.tolist()]
+
+# command line interface with scrape, price, feeds, export, label, train and score commands
+# only the commands that need a browser start one and the ML libraries are only imported by train and score
+# running the script without a command runs main like before
+def cli(argv = None):
+    import argparse
+    parser = argparse.ArgumentParser(description = 'Scrapes deals from Deal News and prices them on Ebay')
+    parser.add_argument('--dir', help = 'project folder with the data files (defaults to the DEAL_NEWS_PROJECT_DIR environment variable)')
+    subparsers = parser.add_subparsers(dest = 'command')
+    
+    scrape_parser = subparsers.add_parser('scrape', help = 'scrape deal news and price the products on ebay')
+    scrape_parser.add_argument('--front-page', action = 'store_true', help = 'only scrape the front page (asks to check accuracy)')
+    scrape_parser.add_argument('--deal-news-workers', type = int, default = 1, help = 'deal news browsers at the same time (0 is one per category page and anything but 1 scrapes the category pages in parallel)')
+    for price_command_parser in [scrape_parser, subparsers.add_parser('price', help = 'price products from a csv or excel file on ebay')]:
+        price_command_parser.add_argument('--backend', choices = ['selenium', 'http'], default = 'selenium')
+        price_command_parser.add_argument('--workers', type = int, default = 1, help = 'ebay sessions at the same time')
+        price_command_parser.add_argument('--requests-per-second', type = float, default = 2)
+        price_command_parser.add_argument('--price-estimate', choices = ['ebay_median', 'ebay_min'], help = 'difference price from the price history instead of the lowest listing')
+    subparsers.choices['price'].add_argument('file', help = 'csv or excel file with Name, Price, Old Price and Website columns')
+    
+    export_parser = subparsers.add_parser('export', help = 'export the product store to excel')
+    export_parser.add_argument('--file', help = 'excel file (defaults to Deal News and Ebay Scraper Data.xlsx)')
+    export_parser.add_argument('--drop-empty', action = 'store_true', help = 'drop rows without a category or ebay price first')
+    
+    label_parser = subparsers.add_parser('label', help = 'change manual answers from a file (or one product at a time without a file)')
+    label_parser.add_argument('file', nargs = '?', help = 'csv or excel file with Name, Binary Answer Check and Feasability columns')
+    label_parser.add_argument('--all-rows', action = 'store_true', help = 'also change rows with a binary answer of 0')
+    
+    train_parser = subparsers.add_parser('train', help = 'train models on the product store')
+    train_parser.add_argument('--incremental', action = 'store_true', help = 'only encode new or changed rows and update models with partial_fit')
+    train_parser.add_argument('--folds', type = int, default = 5)
+    train_parser.add_argument('--save', action = 'store_true', help = 'save the best model for the score command and the scraper')
+    
+    feeds_parser = subparsers.add_parser('feeds', help = 'load deals from csv files and json or rss feeds and price them on ebay')
+    feeds_parser.add_argument('sources', nargs = '+', help = 'files or urls (.csv, .json, .jsonl, .rss or .xml)')
+    feeds_parser.add_argument('--backend', choices = ['selenium', 'http'], default = 'http')
+    feeds_parser.add_argument('--workers', type = int, default = 4, help = 'ebay sessions at the same time')
+    feeds_parser.add_argument('--requests-per-second', type = float, default = 2)
+    feeds_parser.add_argument('--load-only', action = 'store_true', help = 'only load and validate the deals without ebay lookups')
+    
+    score_parser = subparsers.add_parser('score', help = 'score products with the newest saved model')
+    score_parser.add_argument('file', nargs = '?', help = 'csv or excel file of products (defaults to the product store)')
+    score_parser.add_argument('--model', default = 'Product Resell Model')
+    score_parser.add_argument('--top', type = int, default = 20)
+    args = parser.parse_args(argv)
+    
+    if(args.command == 'scrape' and args.front_page and args.deal_news_workers != 1):
+        parser.error('--front-page is one page so it can\'t be scraped with --deal-news-workers')
+    if(args.dir):
+        os.environ['DEAL_NEWS_PROJECT_DIR'] = args.dir
+    if(args.command is None):
+        main()
+        return
+    store = ProductStore(file = project_file('Deal News and Ebay Scraper Data.db'))
+    if(store.count() == 0):
+        store.import_excel(file = project_file('Deal News and Ebay Scraper Data.xlsx'))
+    
+    if(args.command in ['scrape', 'price']):
+        Scraper_obj = Scraper(stats = RunStats(profile_file = None))
+        Scraper_obj.ebay_cache = EbayCache(file = project_file('Ebay Cache.db'), ttl_days = 7, max_entries = 10000)
+        Scraper_obj.price_history = PriceHistory(file = store.file, window_days = 90)
+        Scraper_obj.price_history.import_store(store)
+        Scraper_obj.price_estimate_column = args.price_estimate
+        if(args.command == 'scrape' and args.deal_news_workers != 1):
+            Scraper_obj.scrape_deal_news_parallel(workers = args.deal_news_workers or None)
+        elif(args.command == 'scrape'):
+            Scraper_obj.scrape_deal_news(scrape_extra = args.front_page == False)
+        else:
+            Scraper_obj.product_list = read_product_file(args.file)
+        Scraper_obj.prefilter_products(ProfitPrefilter(store.to_dataframe(), profit_threshold = Scraper_obj.profit_threshold, fee_rate = Scraper_obj.fee_rate), report_file = project_file('Run Report.json'))
+        if(args.workers > 1):
+            Scraper_obj.scrape_ebay_pooled(workers = args.workers, requests_per_second = args.requests_per_second, backend = args.backend)
+        else:
+            Scraper_obj.scrape_ebay(backend = args.backend)
+        Scraper_obj.show_results()
+        print('\nThere were ' + str(len(Scraper_obj.ebay_error_list)) + ' errors during ebay scraping')
+        Scraper_obj.export_to_store(store)
+        Scraper_obj.stats.write_report(file = project_file('Run Report.json'))
+    
+    elif(args.command == 'feeds'):
+        Scraper_obj = Scraper(stats = RunStats(profile_file = None))
+        loader = BulkDealLoader([deal_source(location) for location in args.sources], Scraper_obj, stats = Scraper_obj.stats)
+        if(args.load_only):
+            product_list = loader.load()
+            print('Loaded ' + str(len(product_list)) + ' of ' + str(Scraper_obj.stats.counters['feed records']) + ' deals in ' + str(round(sum(Scraper_obj.stats.timings['feed load']), 2)) + ' seconds')
+        else:
+            Scraper_obj.ebay_cache = EbayCache(file = project_file('Ebay Cache.db'), ttl_days = 7, max_entries = 10000)
+            Scraper_obj.price_history = PriceHistory(file = store.file, window_days = 90)
+            Scraper_obj.price_history.import_store(store)
+            checkpoint = Scraper_obj.run_pipeline(loader.iter_products(), checkpoint_file = project_file('Pipeline Checkpoint.jsonl'), backend = args.backend, workers = args.workers, requests_per_second = args.requests_per_second, store = store)
+            Scraper_obj.show_results()
+            Scraper_obj.stats.write_report(file = project_file('Run Report.json'))
+            checkpoint.clear()
+    
+    elif(args.command == 'export'):
+        if(args.drop_empty):
+            modify_dataframe(store = store)
+        store.export_excel(file = args.file or project_file('Deal News and Ebay Scraper Data.xlsx'))
+    
+    elif(args.command == 'label'):
+        if(args.file is None):
+            Scraper().change_manual_answers(store = store)
+        else:
+            label_editor = LabelEditor(store = store)
+            changed_count, missing_names = label_editor.update_from_file(args.file, only_good = args.all_rows == False)
+            for name in missing_names:
+                print("Couldn't find product:", name)
+            label_editor.save()
+    
+    elif(args.command == 'train'):
+        ml_analysis = load_ml_analysis()
+        if(args.incremental):
+            print(ml_analysis.IncrementalTrainer(directory = project_file('Incremental Model')).update(ml_analysis.read_product_data(store.file, index_by_id = True)))
+        else:
+            ML_obj = ml_analysis.ML(ml_analysis.read_product_data(store.file))
+            ML_obj.one_hot_encode_text_column(column_name_list = ['Name', 'Website', 'Category'], feature_amount_list = [-1, -1, -1], sparse_output = True)
+            ML_obj.train_test_split(test_size = .5, target_column_name = 'Binary Answer Check')
+            results_df = ML_obj.ML_analysis_parallel(folds = args.folds)
+            print(results_df)
+            if(args.save):
+                os.makedirs(project_file('Models'), exist_ok = True)
+                ML_obj.save_best_model(results_df, directory = project_file('Models'), name = 'Product Resell Model')
+    
+    elif(args.command == 'score'):
+        if(args.file is None):
+            product_list = [Product(*row) for row in store.to_dataframe().values.tolist()]
+        else:
+            product_list = read_product_file(args.file)
+        Scraper_obj = Scraper()
+        Scraper_obj.price_history = PriceHistory(file = store.file, window_days = 90)
+        probabilities = Scraper_obj.predict(ModelScorer(directory = project_file('Models'), name = args.model), product_list)
+        for probability, Product_obj in sorted(zip(probabilities, product_list), key = lambda x: x[0], reverse = True)[:args.top]:
+            print(str(round(probability, 2)) + '  ' + Product_obj.name)
+    store.close()
 
-    # modifies dataframe and takes file as a parameter
-    #modify_dataframe(file = 'C:/Computer Science/Deal News and Ebay Project/Deal News and Ebay Scraper Data.xlsx')
-         
-main()
\ No newline at end of file
+if(__name__ == '__main__'):
+    cli()
\ No newline at end of file
@@ -1,28 +1,89 @@
 import pandas as pd
-import seaborn as sns
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split, StratifiedKFold
+from sklearn.base import clone
+from joblib import Parallel, delayed
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.svm import SVC
 from sklearn.neighbors import KNeighborsClassifier
-from sklearn.naive_bayes import GaussianNB
+from sklearn.naive_bayes import GaussianNB, BernoulliNB
 from sklearn import metrics
+import sqlite3
+import numpy as np
+from scipy import sparse
+from collections import Counter
+import random
+import time
+import os
+import pickle
+from urllib.request import pathname2url
+from model_artifact import encode_text, save_artifact
+from run_stats import RunStats
+from project_paths import project_file
+from product_columns import excel_columns, price_aggregate_columns
+
+# the models that are tested and their names for output
+# SVC gets probability = True so a saved SVC scores products with probabilities like the other models
+def build_model_pipeline():
+    model_pipeline = [LogisticRegression(), RandomForestClassifier(), SVC(probability = True, random_state = 22), KNeighborsClassifier(), GaussianNB()]
+    model_list = ['Logistic Regression', 'Random Forest', 'SVC', 'KNN', 'Naive Bayes']
+    return model_pipeline, model_list
+
+# fits and scores a copy of a model on one cross validation fold (runs in a worker process)
+# returns accuracy, auc from probabilities or the decision function and fit and predict times
+def evaluate_fold(model, X, y, train_index, test_index):
+    model = clone(model)
+    X_train, X_test = X[train_index], X[test_index]
+    
+    # naive bayes is the only model that can't take sparse data so only it gets dense data
+    if(isinstance(model, GaussianNB) and sparse.issparse(X_train)):
+        X_train, X_test = X_train.toarray(), X_test.toarray()
+    
+    start = time.perf_counter()
+    model.fit(X_train, y[train_index])
+    fit_time = time.perf_counter() - start
+    start = time.perf_counter()
+    y_pred = model.predict(X_test)
+    predict_time = time.perf_counter() - start
+    
+    # auc needs scores instead of hard labels and both classes in the fold
+    if(hasattr(model, 'predict_proba')):
+        y_score = model.predict_proba(X_test)[:, 1]
+    else:
+        y_score = model.decision_function(X_test)
+    auc = np.nan
+    if(len(np.unique(y[test_index])) > 1):
+        auc = metrics.roc_auc_score(y[test_index], y_score)
+    return metrics.accuracy_score(y[test_index], y_pred), auc, fit_time, predict_time
 
 class ML():
     
     # constructor
-    def __init__(self, df = pd.DataFrame()):
+    def __init__(self, df = pd.DataFrame(), stats = None):
         self.df = df
+        self.stats = stats or RunStats()
         self.orig_df = df
         self.X_train = []
         self.X_test = []
         self.y_train = []
         self.y_test = []
+        self.X = []
+        self.y = []
+        self.sparse_blocks = []
+        self.feature_names = []
+        self.numeric_columns = []
         
     # splits in training and testing datasets 
+    # sparse encoded text columns are stacked in front of the other columns without densifying
     def train_test_split(self, test_size = .2, target_column_name = ''): 
         X = self.df.drop([target_column_name], axis=1)
         y = self.df[target_column_name]
+        self.numeric_columns = list(X.columns)
+        if(len(self.sparse_blocks) > 0):
+            self.feature_names = [word for column_name, matrix, feature_list in self.sparse_blocks for word in feature_list] + list(X.columns)
+            X = sparse.hstack([matrix for column_name, matrix, feature_list in self.sparse_blocks] + [sparse.csr_matrix(X.values.astype(float))], format = 'csr')
+        self.X = X
+        self.y = y
         self.X_train, self.X_test, self.y_train, self.y_test = train_test_split(X, y, test_size = test_size, random_state = 22)
      
     # special version of one hot encoding required because text column is more than 1 word in each column
@@ -46,44 +107,65 @@ class ML():
           
         # return encoded dataframe
         return enc_df
+    
+    # sparse version of special_one_hot_encoder that keeps the same top words by frequency
+    # builds a csr matrix in one pass using a dictionary of word positions and returns it with the ordered word list
+    def sparse_one_hot_encoder(self, column = [], feature_amount = -1):
+        
+        # tokenization step and word counts (ties keep the order words were first seen)
+        token_lists = [text.split() if isinstance(text, str) else [] for text in column]
+        word_counts = Counter(word for row_word_list in token_lists for word in row_word_list)
+        ordered_feature_list = [word for word, count in word_counts.most_common()][:feature_amount]
+        vocabulary = {word: i for i, word in enumerate(ordered_feature_list)}
+        
+        # sets the column positions of the words in each row
+        enc_matrix = encode_text(list(column), vocabulary)
+        return enc_matrix, ordered_feature_list
      
     # one hot encoding for a text column 
-    def one_hot_encode_text_column(self, column_name_list = [], feature_amount_list = []):
+    # if sparse output is True the encoded columns are kept as sparse matrices instead of being added to the dataframe
+    def one_hot_encode_text_column(self, column_name_list = [], feature_amount_list = [], sparse_output = False):
         
         # loops through text column names
         for i in range(0, len(column_name_list)):
             
             # gets desired text column from dataframe and drops it as well
             column = self.df[column_name_list[i]]
-            self.df = self.df.drop(column_name_list[i], 1)
+            self.df = self.df.drop(column_name_list[i], axis = 1)
+            
+            # encodes into a sparse matrix added at the start like the encoded dataframe would be
+            if(sparse_output):
+                with self.stats.stage('encode ' + column_name_list[i]):
+                    enc_matrix, ordered_feature_list = self.sparse_one_hot_encoder(column, feature_amount_list[i])
+                self.sparse_blocks.insert(0, (column_name_list[i], enc_matrix, ordered_feature_list))
+                continue
             
             # one hot encodes text column into a different encoded dataframe
             enc_df = self.special_one_hot_encoder(column, feature_amount_list[i])
             
             # adds encoded dataframe to original dataframe at the start and drops unnecessary index columns that are added 
             self.df = pd.concat([enc_df.reset_index(), self.df.reset_index()], axis=1)
-            self.df = self.df.drop('index', 1)
+            self.df = self.df.drop('index', axis = 1)
     
     # analysis using ML models on data
     def ML_analysis(self):
         
-        # create a model pipeline and appends various models for testing
-        model_pipeline = []
-        model_pipeline.append(LogisticRegression())
-        model_pipeline.append(RandomForestClassifier())
-        model_pipeline.append(SVC())
-        model_pipeline.append(KNeighborsClassifier())
-        model_pipeline.append(GaussianNB())
-        
-        # lists for output
-        model_list = ['Logistic Regression', 'Random Forest', 'SVC', 'KNN', 'Naive Bayes']
+        # create a model pipeline of various models for testing and names for output
+        model_pipeline, model_list = build_model_pipeline()
         acc_list = []
         auc_list = []
         
         # loops through models
         for model in model_pipeline:
-            model.fit(self.X_train, self.y_train) # fit model
-            y_pred = model.predict(self.X_test) # predict using model
+            
+            # naive bayes is the only model that can't take sparse data so only it gets dense data
+            X_train, X_test = self.X_train, self.X_test
+            if(isinstance(model, GaussianNB) and sparse.issparse(X_train)):
+                X_train, X_test = X_train.toarray(), X_test.toarray()
+            with self.stats.stage('fit ' + type(model).__name__):
+                model.fit(X_train, self.y_train) # fit model
+            with self.stats.stage('predict ' + type(model).__name__):
+                y_pred = model.predict(X_test) # predict using model
             
             # metrics for accuracy
             acc_list.append(metrics.accuracy_score(self.y_test, y_pred))
@@ -95,9 +177,273 @@ class ML():
         
         # return results dataframe
         return results_df
+    
+    # analysis using ML models with cross validation where every model and fold is fit at the same time in a process pool
+    # uses all of the data from train_test_split and workers is the amount of processes (-1 uses every core)
+    def ML_analysis_parallel(self, folds = 5, workers = -1):
+        
+        # the feature matrix is memmapped once to a shared file so workers don't each get a copy
+        X = self.X
+        if(isinstance(X, pd.DataFrame)):
+            X = X.values.astype(float)
+        y = np.asarray(self.y)
+        
+        # folds can't be more than the amount of rows in the smallest class
+        folds = min(folds, int(pd.Series(y).value_counts().min()))
+        if(folds < 2):
+            raise ValueError('Each class needs at least 2 rows for cross validation')
+        fold_list = list(StratifiedKFold(n_splits = folds, shuffle = True, random_state = 22).split(np.zeros(len(y)), y))
+        
+        # one job per model and fold
+        model_pipeline, model_list = build_model_pipeline()
+        jobs = [(i, train_index, test_index) for i in range(0, len(model_pipeline)) for train_index, test_index in fold_list]
+        with self.stats.stage('parallel cross validation'):
+            fold_results = Parallel(n_jobs = workers, max_nbytes = '1M', mmap_mode = 'r')(delayed(evaluate_fold)(model_pipeline[i], X, y, train_index, test_index) for i, train_index, test_index in jobs)
+        for job, fold_result in zip(jobs, fold_results):
+            self.stats.record('fit ' + type(model_pipeline[job[0]]).__name__, fold_result[2])
+            self.stats.record('predict ' + type(model_pipeline[job[0]]).__name__, fold_result[3])
+        
+        # averages the fold results for each model
+        results_df = pd.DataFrame([[model_list[job[0]]] + list(fold_result) for job, fold_result in zip(jobs, fold_results)], columns = ['Model', 'Accuracy', 'AUC', 'Fit Time', 'Predict Time'])
+        results_df = results_df.groupby('Model', sort = False).agg(Accuracy = ('Accuracy', 'mean'), Accuracy_Std = ('Accuracy', 'std'), AUC = ('AUC', 'mean'), AUC_Std = ('AUC', 'std'), Fit_Time = ('Fit Time', 'mean'), Predict_Time = ('Predict Time', 'mean')).round(3).reset_index()
+        results_df.columns = ['Model', 'Accuracy', 'Accuracy Std', 'AUC', 'AUC Std', 'Fit Time', 'Predict Time']
+        
+        # return results dataframe
+        return results_df
+    
+    # refits the best model on all of the data and saves it with the encoder vocabulary as a new version in a directory
+    # best model is picked by AUC from a results dataframe (like from ML_analysis_parallel) and name separates different models
+    # only works with sparse output encoding so the vocabulary is known
+    def save_best_model(self, results_df = pd.DataFrame(), directory = '', name = 'Product Resell Model'):
+        model_pipeline, model_list = build_model_pipeline()
+        best_index = model_list.index(results_df.sort_values(['AUC', 'Accuracy'], ascending = False)['Model'].iloc[0])
+        model = model_pipeline[best_index]
+        
+        # naive bayes is the only model that can't take sparse data so only it gets dense data
+        dense = isinstance(model, GaussianNB) and sparse.issparse(self.X)
+        X = self.X
+        if(dense):
+            X = X.toarray()
+        model.fit(X, np.asarray(self.y))
+        
+        artifact = {'model_name': model_list[best_index], 'model': model, 'dense': dense, 'text_columns': [(column_name, feature_list) for column_name, matrix, feature_list in self.sparse_blocks], 'numeric_columns': self.numeric_columns, 'results': results_df.to_dict('records')}
+        file = save_artifact(artifact, directory, name)
+        print('\nSaved ' + model_list[best_index] + ' to:', file)
+        return file
+        
+# trains models on only the rows that are new or changed since the last run instead of refitting on the whole history
+# the vocabularies, token counts, encoded matrix and row hashes are kept in directory between runs
+# vocabularies have a fixed capacity per text column so the matrix width (and so the models) doesn't change as new words show up
+class IncrementalTrainer():
+    
+    # rows are told apart by the dataframe index so read the product store with index by id (excel rows use their row number)
+    def __init__(self, directory = '', text_columns = ['Name', 'Website', 'Category'], target_column_name = 'Binary Answer Check', capacity = 20000, stats = None):
+        self.directory = directory
+        self.text_columns = text_columns
+        self.target_column_name = target_column_name
+        self.capacity = capacity
+        self.stats = stats or RunStats()
+        self.state_file = os.path.join(directory, 'Incremental State.pkl')
+        self.matrix_file = os.path.join(directory, 'Incremental Matrix.npz')
+        self.state = None
+    
+    # the models that support partial_fit and their names for output
+    def build_models(self):
+        return {'SGD Logistic Regression': SGDClassifier(loss = 'log_loss', random_state = 22), 'Naive Bayes': BernoulliNB()}
+    
+    # loads the saved state or starts an empty one the first time
+    def load(self):
+        if(self.state is not None):
+            return self.state
+        if(os.path.exists(self.state_file) and os.path.exists(self.matrix_file)):
+            with open(self.state_file, 'rb') as f:
+                self.state = pickle.load(f)
+            self.state['X'] = sparse.load_npz(self.matrix_file)
+        else:
+            self.state = {'capacity': self.capacity, 'numeric_columns': None, 'vocabularies': {column_name: {} for column_name in self.text_columns}, 'token_counts': {column_name: Counter() for column_name in self.text_columns}, 'row_hashes': {}, 'row_positions': {}, 'X': None, 'y': np.zeros(0, dtype = int), 'models': self.build_models()}
+        return self.state
+    
+    # saves the matrix as npz and everything else in a pickle
+    def save(self):
+        os.makedirs(self.directory, exist_ok = True)
+        sparse.save_npz(self.matrix_file, self.state['X'])
+        with open(self.state_file, 'wb') as f:
+            pickle.dump({key: value for key, value in self.state.items() if key != 'X'}, f)
+    
+    # adds words to the vocabularies (until capacity) and counts tokens of rows seen for the first time
+    def learn_vocabulary(self, df, count_tokens = True):
+        for column_name in self.text_columns:
+            vocabulary = self.state['vocabularies'][column_name]
+            token_counts = self.state['token_counts'][column_name]
+            for text in df[column_name]:
+                if(isinstance(text, str)):
+                    for word in text.split(): # tokenization step
+                        if(count_tokens):
+                            token_counts[word] += 1
+                        if(word not in vocabulary and len(vocabulary) < self.state['capacity']):
+                            vocabulary[word] = len(vocabulary)
+    
+    # encodes rows with the saved vocabularies into a matrix with the full capacity width
+    # numeric columns are log scaled so prices don't swamp the one hot columns in the SGD updates
+    def encode(self, df):
+        blocks = []
+        for column_name in self.text_columns:
+            enc_matrix = encode_text(list(df[column_name]), self.state['vocabularies'][column_name])
+            blocks.append(sparse.csr_matrix((enc_matrix.data, enc_matrix.indices, enc_matrix.indptr), shape = (len(df), self.state['capacity'])))
+        numeric_matrix = np.nan_to_num(df[self.state['numeric_columns']].to_numpy(dtype = float))
+        numeric_matrix = np.sign(numeric_matrix) * np.log1p(np.abs(numeric_matrix))
+        return sparse.hstack(blocks + [sparse.csr_matrix(numeric_matrix)], format = 'csr')
+    
+    # encodes the new and changed rows, updates the models with them and saves the state
+    # returns the accuracy of each model on those rows before it learned from them (the first run has nothing to score)
+    def update(self, df = pd.DataFrame()):
+        state = self.load()
+        if(state['numeric_columns'] is None):
+            state['numeric_columns'] = [column_name for column_name in df.columns if column_name not in self.text_columns and column_name != self.target_column_name]
+        
+        # finds new and changed rows by hashing every row and removed rows by their missing keys
+        with self.stats.stage('incremental hash'):
+            row_hashes = pd.util.hash_pandas_object(df[self.text_columns + state['numeric_columns'] + [self.target_column_name]], index = False).to_numpy()
+        changed_positions = [i for i, (key, row_hash) in enumerate(zip(df.index, row_hashes)) if state['row_hashes'].get(key) != row_hash]
+        changed_df = df.iloc[changed_positions]
+        changed_keys = list(changed_df.index)
+        new_mask = np.array([key not in state['row_positions'] for key in changed_keys], dtype = bool)
+        removed_keys = set(state['row_positions']) - set(df.index)
+        
+        with self.stats.stage('incremental encode'):
+            self.learn_vocabulary(changed_df[new_mask])
+            self.learn_vocabulary(changed_df[~new_mask], count_tokens = False)
+            X_changed = self.encode(changed_df)
+        y_changed = changed_df[self.target_column_name].to_numpy().astype(int)
+        
+        # changed rows replace their old rows in the matrix and new rows are added at the end
+        replaced_keys = removed_keys.union(changed_keys)
+        kept_keys = [key for key in state['row_positions'] if key not in replaced_keys]
+        if(state['X'] is None):
+            state['X'] = X_changed
+            state['y'] = y_changed
+        else:
+            kept_positions = [state['row_positions'][key] for key in kept_keys]
+            state['X'] = sparse.vstack([state['X'][kept_positions], X_changed], format = 'csr')
+            state['y'] = np.concatenate([state['y'][kept_positions], y_changed])
+        state['row_positions'] = {key: i for i, key in enumerate(kept_keys + changed_keys)}
+        for key in removed_keys:
+            del state['row_hashes'][key]
+        for key, position in zip(changed_keys, changed_positions):
+            state['row_hashes'][key] = row_hashes[position]
+        
+        # scores the rows before learning from them and then updates each model without a refit
+        model_list = []
+        acc_list = []
+        for name, model in state['models'].items():
+            model_list.append(name)
+            acc_list.append(np.nan)
+            if(len(changed_keys) == 0):
+                continue
+            if(hasattr(model, 'classes_')):
+                acc_list[-1] = metrics.accuracy_score(y_changed, model.predict(X_changed))
+            with self.stats.stage('partial_fit ' + name):
+                model.partial_fit(X_changed, y_changed, classes = np.array([0, 1]))
+        self.save()
+        
+        print('\n' + str(int(new_mask.sum())) + ' new, ' + str(int((~new_mask).sum())) + ' changed and ' + str(len(removed_keys)) + ' removed rows (' + str(len(state['row_positions'])) + ' total)')
+        return pd.DataFrame({'Model': model_list, 'Accuracy': acc_list, 'Rows': len(changed_keys)})
+    
+    # returns the probability of each row being a good product from every model
+    def predict(self, df = pd.DataFrame()):
+        state = self.load()
+        X = self.encode(df)
+        return pd.DataFrame({name: model.predict_proba(X)[:, 1] for name, model in state['models'].items() if hasattr(model, 'classes_')}, index = df.index)
+        
+# reads the scraped products from the scraper's sqlite product store (.db) or an exported excel file
+# index by id uses the product store's row ids as the index (used by the incremental trainer to tell rows apart)
+# price aggregates adds the scraper's price history aggregates as columns (0 for products without a history or whose aggregates have expired)
+# the .db is opened read only so a missing one isn't created and the excel file next to it is read if it has no products
+def read_product_data(file = '', index_by_id = False, price_aggregates = False):
+    if(file.endswith('.db')):
+        excel_file = os.path.splitext(file)[0] + '.xlsx'
+        try:
+            connection = sqlite3.connect('file:' + pathname2url(os.path.abspath(file)) + '?mode=ro', uri = True)
+            tables = [row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        except sqlite3.OperationalError:
+            print('Could not open ' + file + ', reading ' + excel_file + ' instead')
+            return read_product_data(excel_file, price_aggregates = price_aggregates)
+        if('products' not in tables):
+            connection.close()
+            print('No products in ' + file + ', reading ' + excel_file + ' instead')
+            return read_product_data(excel_file, price_aggregates = price_aggregates)
+        df = pd.read_sql_query('SELECT id, name, price, old_price, website, ebay_price, category, difference_price, binary_answer, binary_answer_check, feasability FROM products ORDER BY id', connection, index_col = 'id')
+        df.columns = excel_columns
+        if(price_aggregates and 'price_names' in tables and 'price_aggregates' in tables):
+            
+            # aggregates saved before they had an expiry are used as they are
+            expired_filter = ''
+            if('expires' in [row[1] for row in connection.execute('PRAGMA table_info(price_aggregates)')]):
+                expired_filter = ' WHERE expires IS NULL OR expires > ' + str(time.time())
+            aggregates_df = pd.read_sql_query('SELECT price_names.name, ebay_median, ebay_volatility, deal_news_trend FROM price_names JOIN price_aggregates ON price_names.name_key = price_aggregates.name_key' + expired_filter, connection, index_col = 'name')
+            aggregates_df.columns = price_aggregate_columns
+            df = df.join(aggregates_df, on = 'Name')
+            df[price_aggregate_columns] = df[price_aggregate_columns].fillna(0)
+        elif(price_aggregates):
+            df[price_aggregate_columns] = 0
+        connection.close()
+        if(index_by_id == False):
+            df = df.reset_index(drop = True)
+        return df
+    df = pd.read_excel(file)
+    if(price_aggregates):
+        df[price_aggregate_columns] = 0
+    return df
+
+# compares the dense special_one_hot_encoder with the sparse encoder on random product names
+# the dense encoder is only run up to dense limit rows because it gets too slow past that
+def benchmark_encoders(row_counts = [10000, 100000], vocabulary_size = 5000, dense_limit = 2000):
+    random.seed(22)
+    words = ['word' + str(i) for i in range(0, vocabulary_size)]
+    for row_count in row_counts:
+        column = pd.Series([' '.join(random.choices(words, k = 8)) for i in range(0, row_count)])
+        ML_obj = ML(pd.DataFrame(index = range(0, row_count)))
+        
+        start = time.perf_counter()
+        enc_matrix, ordered_feature_list = ML_obj.sparse_one_hot_encoder(column, -1)
+        sparse_time = time.perf_counter() - start
+        sparse_memory = enc_matrix.data.nbytes + enc_matrix.indices.nbytes + enc_matrix.indptr.nbytes
+        print(str(row_count) + ' rows sparse: ' + str(round(sparse_time, 3)) + ' s, ' + str(round(sparse_memory / 1e6, 2)) + ' MB')
+        
+        if(row_count <= dense_limit):
+            start = time.perf_counter()
+            enc_df = ML_obj.special_one_hot_encoder(column, -1)
+            dense_time = time.perf_counter() - start
+            dense_memory = enc_df.memory_usage(index = False).sum()
+            print(str(row_count) + ' rows dense: ' + str(round(dense_time, 3)) + ' s, ' + str(round(dense_memory / 1e6, 2)) + ' MB (' + str(round(dense_time / sparse_time, 1)) + 'x slower)')
+
+# benchmarks encoding and fitting on generated product histories shaped like the template file and saves the results as json to compare revisions
+# the dense special_one_hot_encoder is only run up to dense limit rows because it gets too slow past that
+def benchmark_suite(template_file = '', row_counts = [1000, 10000, 100000], dense_limit = 10000, file = ''):
+    from bench_fixtures import Benchmark, synthetic_history
+    benchmark = Benchmark()
+    for row_count in row_counts:
+        df = synthetic_history(row_count, template_file)
         
-# some simple exploratory analysis
+        # encodes a fresh copy each time so every run starts from the raw columns
+        def sparse_encode(df):
+            ML_obj = ML(df.copy())
+            ML_obj.one_hot_encode_text_column(column_name_list = ['Name', 'Website', 'Category'], feature_amount_list = [-1, -1, -1], sparse_output = True)
+            return ML_obj
+        benchmark.run('sparse encoding ' + str(row_count) + ' rows', sparse_encode, [df], row_count)
+        if(row_count <= dense_limit):
+            benchmark.run('dense encoding ' + str(row_count) + ' rows', lambda df: ML(df.copy()).special_one_hot_encoder(df['Name'], -1), [df], row_count)
+        
+        # fitting on the sparse encoded data
+        ML_obj = sparse_encode(df)
+        ML_obj.train_test_split(test_size = .5, target_column_name = 'Binary Answer Check')
+        benchmark.run('logistic regression fit ' + str(row_count) + ' rows', lambda ML_obj: LogisticRegression(max_iter = 1000).fit(ML_obj.X_train, ML_obj.y_train), [ML_obj], row_count // 2)
+    benchmark.write(file)
+    return benchmark.results
+
+# some simple exploratory analysis (seaborn is only imported here because it's slow to import)
 def exploratory_analysis(df = pd.DataFrame()):  
+    import seaborn as sns
     
     # prints info about columns inlcuding data type and non null count for columns
     df.info()
@@ -111,22 +457,52 @@ def exploratory_analysis(df = pd.DataFrame()):
 
 def main():
     
-    # read in excel file as dataframe and drop rows that are null
-    df = pd.read_excel('C:/Computer Science/Deal News and Ebay Project/Deal News and Ebay Scraper Data.xlsx') 
+    # read in product store (or excel file) as dataframe and drop rows that are null
+    # price aggregates = True adds the median ebay price, ebay price volatility and deal news price trend from the scraper's price history
+    df = read_product_data(project_file('Deal News and Ebay Scraper Data.db'), price_aggregates = False) 
+    
+    # only encodes rows that are new or changed since the last run and updates models with partial_fit instead of refitting everything
+    # takes the folder the vocabulary, encoded matrix and models are kept in as a parameter
+    #print(IncrementalTrainer(directory = project_file('Incremental Model')).update(read_product_data(project_file('Deal News and Ebay Scraper Data.db'), index_by_id = True)))
     
     # takes dataframe as parameter and has a couple exploratory analysis methods to look at 
     exploratory_analysis(df)
     
-    ML_obj = ML(df)
+    # times encoding and each model and takes a file to dump a cProfile of the analysis as a parameter (None to not profile)
+    ML_obj = ML(df, stats = RunStats(profile_file = None))
     
     # one hot encoding that takes list of text column names and list of respective max amount of features as parameters
     # if all unique features from column are wanted put -1 or arbitrarily high number 
-    ML_obj.one_hot_encode_text_column(column_name_list = ['Name', 'Website', 'Category'], feature_amount_list = [-1, -1, -1])
+    # sparse output keeps the encoded columns as a sparse matrix which is much faster and smaller for large data
+    ML_obj.one_hot_encode_text_column(column_name_list = ['Name', 'Website', 'Category'], feature_amount_list = [-1, -1, -1], sparse_output = True)
     
     # splits data into train test split and takes test size and target column name as parameter
     ML_obj.train_test_split(test_size = .5, target_column_name = 'Binary Answer Check')
     
     # run ML analysis using multiple models on dataframe and print accuracy results
-    print(ML_obj.ML_analysis())
+    with ML_obj.stats.profile():
+        print(ML_obj.ML_analysis())
+    
+    # cross validated ML analysis that fits all models and folds in parallel and takes folds and amount of processes as parameters
+    #print(ML_obj.ML_analysis_parallel(folds = 5, workers = -1))
+    
+    # saves the best model by AUC so the scraper can score new products and takes results, directory and model name as parameters
+    #ML_obj.save_best_model(ML_obj.ML_analysis_parallel(folds = 5), directory = project_file('Models'), name = 'Product Resell Model')
+    
+    # model using only what's known before the ebay lookup so the scraper can skip products it confidently rejects
+    #pre_lookup_ML_obj = ML(df[['Name', 'Website', 'Price', 'Old Price', 'Binary Answer Check']])
+    #pre_lookup_ML_obj.one_hot_encode_text_column(column_name_list = ['Name', 'Website'], feature_amount_list = [-1, -1], sparse_output = True)
+    #pre_lookup_ML_obj.train_test_split(test_size = .5, target_column_name = 'Binary Answer Check')
+    #pre_lookup_ML_obj.save_best_model(pre_lookup_ML_obj.ML_analysis_parallel(folds = 5), directory = project_file('Models'), name = 'Pre Lookup Model')
+    
+    # writes the timings of the analysis as json and csv and takes file as a parameter
+    ML_obj.stats.write_report(file = project_file('ML Report.json'))
+    
+    # benchmarks the dense and sparse encoders and takes a list of row counts as a parameter
+    #benchmark_encoders(row_counts = [2000, 10000, 100000])
+    
+    # offline benchmarks of encoding and fitting on generated histories and takes the template file, history sizes and results file as parameters
+    #benchmark_suite(template_file = project_file('Deal News and Ebay Scraper Data.xlsx'), row_counts = [1000, 10000, 100000], file = project_file('ML Benchmark.json'))
     
-main()
\ No newline at end of file
+if(__name__ == '__main__'):
+    main()
\ No newline at end of file
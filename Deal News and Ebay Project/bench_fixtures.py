@@ -0,0 +1,186 @@
+import glob
+import http.server
+import json
+import os
+import platform
+import subprocess
+import threading
+import time
+import tracemalloc
+import zlib
+from urllib.parse import urlparse, parse_qs
+from xml.sax.saxutils import escape
+import numpy as np
+import pandas as pd
+from run_stats import RunStats
+from product_columns import excel_columns
+
+# shared by the scraper and the ML analysis benchmarks so both run offline on the same generated data
+
+# generates a product history with the columns and value distributions of the scraper data file
+# names are new combinations of the template words plus a model number so the vocabulary grows with the rows like real data
+def synthetic_history(rows = 1000, template_file = '', seed = 22, profit_threshold = 45, fee_rate = .13):
+    template_df = pd.read_excel(template_file).dropna()
+    rng = np.random.default_rng(seed)
+    words = np.array(sorted({word for name in template_df['Name'] for word in str(name).split()}))
+    name_lengths = template_df['Name'].str.split().str.len().to_numpy()
+
+    names = []
+    for name_length in rng.choice(name_lengths, rows):
+        names.append(' '.join(rng.choice(words, name_length - 1)) + ' X' + str(rng.integers(0, rows)))
+
+    # prices keep the template's discount and ebay price ratios
+    prices = np.round(rng.choice(template_df['Price'].to_numpy(), rows) * rng.lognormal(0, .3, rows), 2)
+    old_prices = np.round(prices * rng.choice((template_df['Old Price'] / template_df['Price']).to_numpy(), rows), 2)
+    ebay_prices = np.round(prices * rng.choice((template_df['Ebay Price'] / template_df['Price']).to_numpy(), rows), 2)
+    difference_prices = (ebay_prices - prices - ebay_prices * fee_rate).astype(int)
+    binary_answers = (difference_prices >= profit_threshold).astype(int)
+
+    # a share of the good products are labeled like they would be by hand
+    binary_answer_checks = binary_answers * (rng.random(rows) < .3)
+    feasabilities = binary_answer_checks * (rng.random(rows) < .5)
+
+    return pd.DataFrame({'Name': names, 'Price': prices, 'Old Price': old_prices, 'Website': rng.choice(template_df['Website'].to_numpy(), rows), 'Ebay Price': ebay_prices, 'Category': rng.choice(template_df['Category'].to_numpy(), rows), 'Difference Price': difference_prices, 'Binary Answer': binary_answers, 'Binary Answer Check': binary_answer_checks.astype(int), 'Feasability': feasabilities.astype(int)}, columns = excel_columns)
+
+# builds an ebay search results page for a name with the classes the scraper reads
+# the first result and category are placeholders like on ebay and titles are the name with a few words changed
+def ebay_results_page(name = '', listings = 50, seed = 22):
+    rng = np.random.default_rng(seed)
+    words = name.split()
+    items = ['<li class="s-item"><div class="s-item__title">Shop on eBay</div><span class="s-item__price">$20.00</span></li>']
+    for i in range(0, listings):
+        title_words = list(words)
+        for j in rng.choice(len(title_words), min(2, len(title_words)), replace = False):
+            title_words[j] = 'Brand' + str(rng.integers(0, 100))
+        items.append('<li class="s-item"><div class="s-item__title"><span>' + ' '.join(title_words) + '</span></div><span class="s-item__price">$' + format(rng.uniform(5, 500), ',.2f') + '</span></li>')
+    return '<html><body><ul class="srp-refine__category__list"><li class="srp-refine__category__item">All Categories</li><li class="srp-refine__category__item">Consumer Electronics</li></ul><ul class="srp-results">' + ''.join(items) + '</ul></body></html>'
+
+# local http server that answers ebay searches with recorded pages
+# if the fixture dir has .html files each search gets one of them (the same one for the same search) otherwise a page is generated for the searched name
+# routes maps other paths (like /deals.json) to (content type, text) to serve deal feeds
+# latency is seconds added to each response to act like the network
+class StubServer():
+
+    def __init__(self, fixture_dir = '', latency = 0, routes = {}):
+        self.routes = {path: (content_type, text.encode('utf-8')) for path, (content_type, text) in routes.items()}
+        self.pages = []
+        for fixture_file in sorted(glob.glob(os.path.join(fixture_dir, '*.html'))):
+            with open(fixture_file, encoding = 'utf-8') as f:
+                self.pages.append(f.read().encode('utf-8'))
+        self.latency = latency
+        self.server = None
+        self.thread = None
+
+    # the page for a request path
+    def page(self, path):
+        name = parse_qs(urlparse(path).query).get('_nkw', [''])[0]
+        if(len(self.pages) > 0):
+            return self.pages[zlib.crc32(name.encode('utf-8')) % len(self.pages)]
+        return ebay_results_page(name, seed = zlib.crc32(name.encode('utf-8'))).encode('utf-8')
+
+    def start(self):
+        stub = self
+
+        # keep alive so the scraper's connection pool reuses connections like it would with ebay
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                if(stub.latency > 0):
+                    time.sleep(stub.latency)
+                content_type, body = stub.routes.get(urlparse(self.path).path, ('text/html; charset=utf-8', None))
+                if(body is None):
+                    body = stub.page(self.path)
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target = self.server.serve_forever, daemon = True)
+        self.thread.start()
+        return self
+
+    # base url to send requests to in place of https://www.ebay.com
+    def url(self):
+        return 'http://127.0.0.1:' + str(self.server.server_address[1])
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+# deal feed texts (csv, json and rss) of a product history in the formats partners and feeds send them
+def deal_feeds(history_df = pd.DataFrame()):
+    deals_df = history_df[['Name', 'Price', 'Old Price', 'Website']]
+    csv_text = deals_df.to_csv(index = False)
+    json_text = json.dumps({'items': [{'title': name, 'price': price, 'list_price': old_price, 'store': website} for name, price, old_price, website in deals_df.itertuples(index = False)]})
+    items = ['<item><title>' + escape(name) + ' for $' + format(price, '.2f') + '</title><description>List price $' + format(old_price, '.2f') + '</description><source>' + escape(website) + '</source></item>' for name, price, old_price, website in deals_df.itertuples(index = False)]
+    rss_text = '<?xml version="1.0"?><rss version="2.0"><channel><title>Deals</title>' + ''.join(items) + '</channel></rss>'
+    return csv_text, json_text, rss_text
+
+# short git hash of the code being benchmarked so results from different revisions can be told apart
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd = os.path.dirname(os.path.abspath(__file__)), capture_output = True, text = True, timeout = 5).stdout.strip() or 'unknown'
+    except (OSError, subprocess.SubprocessError):
+        return 'unknown'
+
+# runs benchmark stages and records throughput, p50/p95 latency and peak memory of each
+class Benchmark():
+
+    # trace memory can be set to False because tracemalloc slows down python code while it's on
+    def __init__(self, revision = None, trace_memory = True):
+        self.revision = revision or git_revision()
+        self.trace_memory = trace_memory
+        self.stats = RunStats()
+        self.results = {}
+
+    # calls function on each item and times each call
+    # units per item is how many rows or products each call handles so throughput is in units per second
+    def run(self, name, function, items = [], units_per_item = 1):
+        if(self.trace_memory):
+            tracemalloc.start()
+        start = time.perf_counter()
+        for item in items:
+            with self.stats.stage(name):
+                function(item)
+        elapsed = time.perf_counter() - start
+        peak_memory = 0
+        if(self.trace_memory):
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        timings = sorted(self.stats.timings[name])
+        self.results[name] = {'items': len(items), 'seconds': round(elapsed, 4), 'throughput': round(len(items) * units_per_item / max(elapsed, 1e-9), 2), 'p50_ms': round(self.stats.percentile(timings, 50) * 1000, 3), 'p95_ms': round(self.stats.percentile(timings, 95) * 1000, 3), 'peak_memory_mb': round(peak_memory / 1e6, 2)}
+        print(name + ': ' + str(self.results[name]['throughput']) + '/s, p50 ' + str(self.results[name]['p50_ms']) + ' ms, p95 ' + str(self.results[name]['p95_ms']) + ' ms, peak ' + str(self.results[name]['peak_memory_mb']) + ' MB')
+        return self.results[name]
+
+    # saves the results as json
+    def write(self, file = ''):
+        with open(file, 'w') as f:
+            json.dump({'revision': self.revision, 'created': time.time(), 'python': platform.python_version(), 'platform': platform.platform(), 'results': self.results}, f, indent = 2)
+        print('\nBenchmark results written to:', file)
+
+# prints how each stage changed between two saved benchmark results (a ratio over 1 means the new revision is faster)
+def compare_benchmarks(old_file = '', new_file = ''):
+    with open(old_file) as f:
+        old = json.load(f)
+    with open(new_file) as f:
+        new = json.load(f)
+    print('Stage, ' + old['revision'] + ' -> ' + new['revision'])
+    for name, new_result in new['results'].items():
+        if(name not in old['results']):
+            print(name + ': new stage')
+            continue
+        old_result = old['results'][name]
+        print(name + ': throughput ' + str(round(new_result['throughput'] / max(old_result['throughput'], 1e-9), 2)) + 'x, p95 ' + str(old_result['p95_ms']) + ' -> ' + str(new_result['p95_ms']) + ' ms, peak ' + str(old_result['peak_memory_mb']) + ' -> ' + str(new_result['peak_memory_mb']) + ' MB')
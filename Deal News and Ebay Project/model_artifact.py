@@ -0,0 +1,92 @@
+import glob
+import os
+import pickle
+import re
+import time
+import numpy as np
+
+# shared by the ML analysis (which saves trained models) and the scraper (which scores new products with them)
+
+# one hot encodes a list of texts into a sparse matrix using a fixed vocabulary of word positions
+def encode_text(texts = [], vocabulary = {}):
+    from scipy import sparse
+    indptr = [0]
+    indices = []
+    for text in texts:
+        if(isinstance(text, str)):
+            indices.extend(sorted({vocabulary[word] for word in text.split() if word in vocabulary})) # tokenization step
+        indptr.append(len(indices))
+    return sparse.csr_matrix((np.ones(len(indices), dtype = np.int8), indices, indptr), shape = (len(texts), len(vocabulary)))
+
+# gets the saved versions of a model in a directory sorted from oldest to newest
+def artifact_versions(directory = '', name = 'Product Resell Model'):
+    versions = []
+    for file in glob.glob(os.path.join(directory, name + ' v*.pkl')):
+        match = re.search(r' v(\d+)\.pkl$', file)
+        if(match):
+            versions.append((int(match.group(1)), file))
+    return sorted(versions)
+
+# saves a model artifact as the next version and returns its file path
+def save_artifact(artifact = {}, directory = '', name = 'Product Resell Model'):
+    versions = artifact_versions(directory, name)
+    version = 1
+    if(len(versions) > 0):
+        version = versions[-1][0] + 1
+    artifact = dict(artifact, version = version, created = time.time())
+    file = os.path.join(directory, name + ' v' + str(version) + '.pkl')
+    with open(file, 'wb') as f:
+        pickle.dump(artifact, f)
+    return file
+
+# loads the newest version of a model artifact
+def load_latest_artifact(directory = '', name = 'Product Resell Model'):
+    versions = artifact_versions(directory, name)
+    if(len(versions) == 0):
+        raise FileNotFoundError('No saved ' + name + ' in ' + directory)
+    with open(versions[-1][1], 'rb') as f:
+        return pickle.load(f)
+
+# scores rows of product data with a saved model without refitting anything
+# the artifact is only loaded the first time something is scored
+class ModelScorer():
+
+    def __init__(self, directory = '', name = 'Product Resell Model'):
+        self.directory = directory
+        self.name = name
+        self.artifact = None
+
+    # loads the newest artifact if it isn't loaded yet
+    def load(self):
+        if(self.artifact is None):
+            self.artifact = load_latest_artifact(self.directory, self.name)
+        return self.artifact
+
+    # builds the feature matrix in the same column order the model was trained with
+    # rows is a list of rows of values in the order of columns
+    def encode(self, rows = [], columns = []):
+        from scipy import sparse
+        artifact = self.load()
+        column_positions = {column: i for i, column in enumerate(columns)}
+        blocks = []
+        for column_name, ordered_feature_list in artifact['text_columns']:
+            vocabulary = {word: i for i, word in enumerate(ordered_feature_list)}
+            blocks.append(encode_text([row[column_positions[column_name]] for row in rows], vocabulary))
+        numeric_values = [[row[column_positions[column_name]] for column_name in artifact['numeric_columns']] for row in rows]
+        numeric_matrix = np.nan_to_num(np.array(numeric_values, dtype = float).reshape(len(rows), len(artifact['numeric_columns'])))
+        X = sparse.hstack(blocks + [sparse.csr_matrix(numeric_matrix)], format = 'csr')
+        if(artifact['dense']):
+            X = X.toarray()
+        return X
+
+    # returns the probability of each row being a good product in one batch
+    # models without predict_proba (like an SVC saved without probability = True) get their decision function squashed between 0 and 1
+    # so low scores still mean confident rejections instead of every negative prediction being 0
+    def predict(self, rows = [], columns = []):
+        if(len(rows) == 0):
+            return np.zeros(0)
+        model = self.load()['model']
+        X = self.encode(rows, columns)
+        if(hasattr(model, 'predict_proba')):
+            return model.predict_proba(X)[:, 1]
+        return 1 / (1 + np.exp(-model.decision_function(X)))
@@ -0,0 +1,7 @@
+# shared by the scraper, the ML analysis and the benchmark fixtures so the data file columns are defined once
+
+# columns of the exported data in the same order as Product.excel_format
+excel_columns = ['Name', 'Price', 'Old Price', 'Website', 'Ebay Price', 'Category', 'Difference Price', 'Binary Answer', 'Binary Answer Check', 'Feasability']
+
+# price history aggregates the ML analysis can train on (read_product_data with price aggregates) in the order of PriceHistory.features
+price_aggregate_columns = ['Ebay Median', 'Ebay Volatility', 'Deal News Trend']
@@ -0,0 +1,19 @@
+import os
+
+# shared by the scraper and the ML analysis so the project folder and chromedriver can be moved without editing the code
+
+# folder with the data files which is the DEAL_NEWS_PROJECT_DIR environment variable (the --dir command line option sets it)
+def project_dir():
+    return os.environ.get('DEAL_NEWS_PROJECT_DIR', 'C:/Computer Science/Deal News and Ebay Project')
+
+# path of a file in the project folder
+def project_file(name = ''):
+    return os.path.join(project_dir(), name)
+
+# chromedriver path which is the CHROMEDRIVER_PATH environment variable
+# if the file doesn't exist None is returned so selenium finds a driver itself
+def chromedriver_path():
+    path = os.environ.get('CHROMEDRIVER_PATH', 'C:/Computer Science/chromedriver_win32/chromedriver.exe')
+    if(os.path.exists(path)):
+        return path
+    return None
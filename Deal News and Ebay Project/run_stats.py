@@ -0,0 +1,107 @@
+import cProfile
+import csv
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+# shared by the scraper and the ML analysis to time stages of a run and count products, retries and errors
+
+# timings, counters and errors of a run that can be written out as a json and csv report
+# if a profile file is passed profile() dumps a cProfile of the code run inside it
+class RunStats():
+
+    # upper edges in seconds of the latency histogram buckets (the last bucket is anything slower)
+    bucket_edges = [.01, .05, .1, .25, .5, 1, 2.5, 5, 10, 30, 60]
+
+    def __init__(self, profile_file = None):
+        self.profile_file = profile_file
+        self.start_time = time.time()
+        self.timings = defaultdict(list)
+        self.counters = Counter()
+        self.errors = Counter()
+        self.lock = threading.Lock()
+
+    # times the code inside of it as a stage and counts the type of any error raised
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.record_error(name, e)
+            raise
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    # records a time in seconds for a stage
+    def record(self, name, seconds):
+        with self.lock:
+            self.timings[name].append(seconds)
+
+    # adds to a counter like products or retries
+    def count(self, name, amount = 1):
+        with self.lock:
+            self.counters[name] += amount
+
+    # counts an error by stage and exception type
+    def record_error(self, name, error):
+        with self.lock:
+            self.errors[(name, type(error).__name__)] += 1
+
+    # dumps a cProfile of the code inside of it if there's a profile file
+    @contextmanager
+    def profile(self):
+        if(self.profile_file is None):
+            yield
+            return
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(self.profile_file)
+
+    # counts of timings in each histogram bucket
+    def histogram(self, timings = []):
+        bucket_counts = [0] * (len(self.bucket_edges) + 1)
+        for seconds in timings:
+            bucket = 0
+            while(bucket < len(self.bucket_edges) and seconds > self.bucket_edges[bucket]):
+                bucket += 1
+            bucket_counts[bucket] += 1
+        return bucket_counts
+
+    # value at a percentile of sorted timings
+    def percentile(self, sorted_timings = [], percent = 50):
+        if(len(sorted_timings) == 0):
+            return 0
+        return sorted_timings[min(len(sorted_timings) - 1, int(len(sorted_timings) * percent / 100))]
+
+    # summary of the run as a dictionary
+    def summary(self):
+        with self.lock:
+            timings = {name: sorted(stage_timings) for name, stage_timings in self.timings.items()}
+            counters = dict(self.counters)
+            errors = dict(self.errors)
+        elapsed = time.time() - self.start_time
+        stages = {}
+        for name, stage_timings in timings.items():
+            stages[name] = {'count': len(stage_timings), 'total': round(sum(stage_timings), 4), 'mean': round(sum(stage_timings) / len(stage_timings), 4), 'p50': round(self.percentile(stage_timings, 50), 4), 'p95': round(self.percentile(stage_timings, 95), 4), 'max': round(stage_timings[-1], 4), 'histogram': self.histogram(stage_timings)}
+        return {'started': self.start_time, 'elapsed': round(elapsed, 2), 'products_per_minute': round(counters.get('products', 0) / max(elapsed / 60, 1e-9), 2), 'histogram_edges': self.bucket_edges, 'stages': stages, 'counters': counters, 'errors': [{'stage': stage, 'type': error_type, 'count': count} for (stage, error_type), count in errors.items()]}
+
+    # writes the summary as json and the stage timings as a csv next to it
+    def write_report(self, file = ''):
+        summary = self.summary()
+        with open(file, 'w') as f:
+            json.dump(summary, f, indent = 2)
+        with open(os.path.splitext(file)[0] + '.csv', 'w', newline = '') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Stage', 'Count', 'Total', 'Mean', 'P50', 'P95', 'Max'])
+            for name, stage in summary['stages'].items():
+                writer.writerow([name, stage['count'], stage['total'], stage['mean'], stage['p50'], stage['p95'], stage['max']])
+        print('\nRun report written to:', file)
+        return summary
@@ -0,0 +1,34 @@
+import importlib.util
+import os
+import sys
+import pytest
+
+# the scripts have spaces in their names so they're loaded from their files instead of imported
+
+project_folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_folder)
+
+def load_script(module_name, file_name):
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(project_folder, file_name))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+@pytest.fixture(scope = 'session')
+def scraper_module():
+    return load_script('deal_news_scraper', 'Deal News and Ebay Scraper.py')
+
+@pytest.fixture(scope = 'session')
+def ml_module():
+    return load_script('product_resell_ml_analysis', 'Product Resell ML Analysis.py')
+
+# a Scraper with its own lists and stats (they're class-wide) that writes its files to a temporary folder
+@pytest.fixture
+def scraper(scraper_module, tmp_path, monkeypatch):
+    monkeypatch.setenv('DEAL_NEWS_PROJECT_DIR', str(tmp_path))
+    Scraper_obj = scraper_module.Scraper()
+    Scraper_obj.product_list = []
+    Scraper_obj.ebay_error_list = []
+    Scraper_obj.deal_news_error_list = []
+    Scraper_obj.wait_policy = scraper_module.WaitPolicy(default_timeout = .5, settle_time = 0, poll_interval = 0, stats = Scraper_obj.stats)
+    return Scraper_obj
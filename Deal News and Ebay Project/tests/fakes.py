@@ -0,0 +1,170 @@
+import threading
+from html.parser import HTMLParser
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
+
+# stands in for chrome browsers on ebay and deal news so sessions and scrapers can be tested without one
+
+class FakeElement():
+
+    def __init__(self, browser = None, text = ''):
+        self.browser = browser
+        self.text = text
+
+    def send_keys(self, text):
+        self.browser.search_name = text
+
+    def click(self):
+        pass
+
+# missing links are link texts (like Free Shipping) that no search has
+# a name in no match names gets ebay's no exact match page and a name in failing names has no buy it now link
+# page load failures is how many gets fail before pages load again
+class FakeEbayBrowser():
+
+    def __init__(self, missing_links = [], no_match_names = [], failing_names = [], page_load_failures = 0):
+        self.missing_links = set(missing_links)
+        self.no_match_names = set(no_match_names)
+        self.failing_names = set(failing_names)
+        self.page_load_failures = page_load_failures
+        self.search_name = ''
+        self.gets = 0
+
+    def get(self, url):
+        self.gets += 1
+        if(self.page_load_failures > 0):
+            self.page_load_failures -= 1
+            raise WebDriverException('net::ERR_CONNECTION_RESET')
+
+    def find_element(self, by, value):
+        if(value == 'srp-save-null-search__heading'):
+            if(self.search_name in self.no_match_names):
+                return FakeElement(self, 'No exact matches found')
+            raise NoSuchElementException(value)
+        if(value in self.missing_links or (value == 'Buy It Now' and self.search_name in self.failing_names)):
+            raise NoSuchElementException(value)
+        return FakeElement(self)
+
+    # results are the searched name at a price from its length so each product gets its own ebay price
+    def find_elements(self, by, value):
+        if(value == 's-item__price'):
+            return [FakeElement(self, '$20.00'), FakeElement(self, '$' + str(100 + len(self.search_name)) + '.00')]
+        if(value == 's-item__title'):
+            return [FakeElement(self, 'Shop on eBay'), FakeElement(self, self.search_name)]
+        if(value == 'srp-refine__category__item'):
+            return [FakeElement(self, 'All Categories'), FakeElement(self, 'Consumer Electronics')]
+        return []
+
+    def execute_script(self, script):
+        return 'complete'
+
+    def quit(self):
+        pass
+
+    def close(self):
+        pass
+
+# a deal news browser where pages maps each url to its deals as (name, price, website) like deal news shows them
+# failures maps a url to how many more times loading it fails (shared by every browser like a page that keeps crashing tabs)
+class FakeDealNewsBrowser():
+
+    def __init__(self, pages = {}, failures = {}, lock = None):
+        self.pages = pages
+        self.failures = failures
+        self.lock = lock or threading.Lock()
+        self.url = None
+        self.failed_urls = []
+        self.loaded_urls = []
+        self.quit_called = False
+
+    def get(self, url):
+        with self.lock:
+            if(self.failures.get(url, 0) > 0):
+                self.failures[url] -= 1
+                self.failed_urls.append(url)
+                raise WebDriverException('tab crashed')
+        self.url = url
+        self.loaded_urls.append(url)
+
+    def execute_script(self, script):
+        return 'complete'
+
+    def find_elements(self, by, value):
+        deals = self.pages.get(self.url, [])
+        if(value.startswith('callout')):
+            return [FakeElement(self, price) for name, price, website in deals]
+        if(value.startswith('title')):
+            return [FakeElement(self, name) for name, price, website in deals]
+        if(value.startswith('key-attribute')):
+            return [FakeElement(self, website + ' · Free Shipping') for name, price, website in deals]
+        return []
+
+    def quit(self):
+        self.quit_called = True
+
+    def close(self):
+        self.quit_called = True
+
+# finds the elements that have every class of a compound class name (like selenium's By.CLASS_NAME with dots) and their text
+class CompoundClassParser(HTMLParser):
+
+    void_tags = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+
+    def __init__(self, selector = ''):
+        super().__init__(convert_charrefs = True)
+        self.classes = set(selector.split('.'))
+        self.texts = []
+        self.open_tags = [] # stack of (tag, text started at tag or None)
+        self.skipped_tags = 0
+
+    def handle_starttag(self, tag, attrs):
+        if(tag in self.void_tags):
+            return
+        if(tag in ['script', 'style']):
+            self.skipped_tags += 1
+        text = None
+        if(self.classes.issubset((dict(attrs).get('class') or '').split())):
+            text = []
+            self.texts.append(text)
+        self.open_tags.append((tag, text))
+
+    def handle_endtag(self, tag):
+        if(tag in ['script', 'style']):
+            self.skipped_tags -= 1
+        for i in range(len(self.open_tags) - 1, -1, -1):
+            if(self.open_tags[i][0] == tag):
+                del self.open_tags[i:]
+                break
+
+    def handle_data(self, data):
+        if(self.skipped_tags > 0):
+            return
+        for tag, text in self.open_tags:
+            if(text is not None):
+                text.append(data)
+
+# a browser that loads saved deal news pages where pages maps each url to an html file
+class FixturePageBrowser():
+
+    def __init__(self, pages = {}):
+        self.pages = pages
+        self.html = ''
+
+    def get(self, url):
+        with open(self.pages[url], encoding = 'utf-8') as f:
+            self.html = f.read()
+
+    def execute_script(self, script):
+        return 'complete'
+
+    # element text is whitespace collapsed like selenium shows it
+    def find_elements(self, by, value):
+        parser = CompoundClassParser(value)
+        parser.feed(self.html)
+        parser.close()
+        return [FakeElement(self, ' '.join(''.join(text).split())) for text in parser.texts]
+
+    def quit(self):
+        pass
+
+    def close(self):
+        pass
@@ -0,0 +1,50 @@
+import http.server
+import threading
+import pytest
+
+# answers with redirects (absolute, relative to the root and relative to the page) and the path that was finally reached
+class RedirectHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    redirects = {'/absolute': '/deals/page', '/deals/relative': 'page?sort=new', '/deals/up': '../deals/page', '/missing': None}
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        if(path in self.redirects):
+            self.send_response(302)
+            if(self.redirects[path] is not None):
+                location = self.redirects[path]
+                if(path == '/absolute'):
+                    location = 'http://' + self.headers['Host'] + location
+                self.send_header('Location', location)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = self.path.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def server_url():
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), RedirectHandler)
+    threading.Thread(target = server.serve_forever, daemon = True).start()
+    yield 'http://127.0.0.1:' + str(server.server_address[1])
+    server.shutdown()
+    server.server_close()
+
+def test_redirects(scraper_module, server_url):
+    pool = scraper_module.ConnectionPool()
+    assert pool.get(server_url + '/absolute') == (200, '/deals/page')
+    assert pool.get(server_url + '/deals/relative') == (200, '/deals/page?sort=new')
+    assert pool.get(server_url + '/deals/up') == (200, '/deals/page')
+    pool.close()
+
+def test_redirect_without_location(scraper_module, server_url):
+    pool = scraper_module.ConnectionPool()
+    with pytest.raises(ValueError, match = 'no Location header'):
+        pool.get(server_url + '/missing')
+    pool.close()
@@ -0,0 +1,76 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from fakes import FakeDealNewsBrowser, FixturePageBrowser
+
+urls = ['https://www.dealnews.com/c1/', 'https://www.dealnews.com/c2/', 'https://www.dealnews.com/c3/', 'https://www.dealnews.com/c4/']
+pages = {urls[0]: [('Lamp', '$10 $20', 'Amazon'), ('Chair', '$30 $60', 'Walmart')], urls[1]: [('Chair', '$30 $60', 'Walmart'), ('Desk', '$50 $90', 'Target'), ('Fan', '$15', 'Amazon')], urls[2]: [('Rug', '$25 $40', 'Amazon')], urls[3]: [('Chair', '$28 $60', 'Walmart'), ('Chair', '$30 $60', 'Target')]}
+
+def run_parallel(scraper_module, scraper, monkeypatch, failures = {}, workers = 2, retries = 2):
+    browsers = []
+    def create_browser():
+        browsers.append(FakeDealNewsBrowser(pages, failures))
+        return browsers[-1]
+    monkeypatch.setattr(scraper_module, 'create_browser', create_browser)
+    scraper.deal_news_urls = lambda scrape_extra = False: (urls, 5000)
+    scraper.scrape_deal_news_parallel(workers = workers, retries = retries, backoff = 0)
+    return browsers
+
+# pages are merged in url order and a product is only dropped if its name, price and website were all seen before
+def test_merges_in_url_order_and_dedupes(scraper_module, scraper, monkeypatch):
+    browsers = run_parallel(scraper_module, scraper, monkeypatch)
+    assert [(Product_obj.name, Product_obj.price, Product_obj.website) for Product_obj in scraper.product_list] == [('Lamp', 10, 'Amazon'), ('Chair', 30, 'Walmart'), ('Desk', 50, 'Target'), ('Rug', 25, 'Amazon'), ('Chair', 28, 'Walmart'), ('Chair', 30, 'Target')]
+    assert scraper.deal_news_error_list == []
+    assert all(browser.quit_called for browser in browsers)
+
+# a page that fails is retried with a new browser and only a page that fails every attempt is an error
+def test_retries_with_new_browser(scraper_module, scraper, monkeypatch):
+    browsers = run_parallel(scraper_module, scraper, monkeypatch, failures = {urls[1]: 1, urls[2]: 3}, retries = 2)
+    assert [Product_obj.name for Product_obj in scraper.product_list] == ['Lamp', 'Chair', 'Desk', 'Chair', 'Chair']
+    assert len(scraper.deal_news_error_list) == 1
+    assert scraper.stats.counters['deal news retries'] == 4
+    failed_browsers = [browser for browser in browsers if urls[1] in browser.failed_urls]
+    assert len(failed_browsers) == 1
+    assert urls[1] not in failed_browsers[0].loaded_urls
+    assert any(urls[1] in browser.loaded_urls for browser in browsers)
+    assert all(browser.quit_called for browser in browsers)
+
+# the scrape command scrapes deal news in parallel with more than 1 deal news worker
+def test_cli_deal_news_workers(scraper_module, tmp_path, monkeypatch):
+    class Stop(Exception):
+        pass
+    calls = []
+    def prefilter_products(self, ProfitPrefilter_obj, report_file = ''):
+        raise Stop()
+    monkeypatch.setenv('DEAL_NEWS_PROJECT_DIR', str(tmp_path))
+    monkeypatch.setattr(scraper_module.Scraper, 'scrape_deal_news_parallel', lambda self, workers = 4, retries = 2, backoff = 2: calls.append(workers))
+    monkeypatch.setattr(scraper_module.Scraper, 'scrape_deal_news', lambda self, scrape_extra = False: calls.append('serial'))
+    monkeypatch.setattr(scraper_module.Scraper, 'prefilter_products', prefilter_products)
+    for argv in [['--dir', str(tmp_path), 'scrape', '--deal-news-workers', '3'], ['--dir', str(tmp_path), 'scrape']]:
+        try:
+            scraper_module.cli(argv)
+        except Stop:
+            pass
+    assert calls == [3, 'serial']
+
+fixture_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# a saved deal news page is parsed into products and deals without a new and old price are left out
+def test_scrape_saved_deal_news_page(scraper, monkeypatch):
+    browser = FixturePageBrowser({urls[0]: os.path.join(fixture_folder, 'dealnews_electronics.html')})
+    product_list = scraper.scrape_deal_news_page(urls[0], 5000, scrape_extra = True, browser = browser)
+    assert [(Product_obj.name, Product_obj.price, Product_obj.website) for Product_obj in product_list] == [('Apple AirPods Pro (2nd Gen) w/ USB-C MagSafe Case', '$189 $249', 'Amazon'), ('Samsung 65" Crystal UHD 4K Smart TV', '$397.99 $529.99', 'Walmart'), ('Sony WH-1000XM5 Noise Canceling Headphones', '$1,049.99 $1,299.99', 'Best')]
+    assert scraper.stats.counters['deal news products'] == 4
+
+# saved category pages are scraped with a browser each by default, merged in url order and deduplicated
+def test_parallel_saved_deal_news_pages(scraper_module, scraper, monkeypatch):
+    pages = {urls[0]: os.path.join(fixture_folder, 'dealnews_electronics.html'), urls[1]: os.path.join(fixture_folder, 'dealnews_home.html')}
+    pool_sizes = []
+    def thread_pool_executor(max_workers = None):
+        pool_sizes.append(max_workers)
+        return ThreadPoolExecutor(max_workers = max_workers)
+    monkeypatch.setattr(scraper_module, 'ThreadPoolExecutor', thread_pool_executor)
+    monkeypatch.setattr(scraper_module, 'create_browser', lambda: FixturePageBrowser(pages))
+    scraper.deal_news_urls = lambda scrape_extra = False: (urls[0:2], 5000)
+    scraper.scrape_deal_news_parallel(backoff = 0)
+    assert pool_sizes == [2]
+    assert [(Product_obj.name, Product_obj.price, Product_obj.old_price) for Product_obj in scraper.product_list] == [('Apple AirPods Pro (2nd Gen) w/ USB-C MagSafe Case', 189, 249), ('Samsung 65" Crystal UHD 4K Smart TV', 397.99, 529.99), ('Sony WH-1000XM5 Noise Canceling Headphones', 1049.99, 1299.99), ('Dyson V8 Cordless Stick Vacuum', 299.99, 469.99)]
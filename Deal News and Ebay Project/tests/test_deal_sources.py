@@ -0,0 +1,64 @@
+import json
+import pytest
+from bench_fixtures import StubServer
+
+csv_text = 'Name,Price,Old Price,Website\nLamp,10,20,Amazon\n,15,30,Amazon\nChair,30,,Walmart\nDesk,"1,050.50",1200,Target\n'
+json_fields = {'name': 'title', 'price': 'price', 'old_price': 'list_price', 'website': 'store'}
+json_text = json.dumps({'items': [{'title': 'LAMP ', 'price': 10, 'list_price': 20, 'store': 'Walmart'}, {'title': 'Fan', 'price': 12.5, 'list_price': 25, 'store': 'Amazon'}]})
+rss_text = '<?xml version="1.0"?><rss version="2.0"><channel><title>Deals</title><item><title>Apple AirPods Pro for $189</title><description>List price $249</description><link>https://www.bestbuy.com/airpods</link></item><item><title>Rug $25</title><description>No list price</description><source>Target</source></item></channel></rss>'
+
+def records(source, text):
+    return [(Product_obj.name, Product_obj.price, Product_obj.website) for Product_obj in map(source.product, source.parse(text))]
+
+def test_csv_source(scraper_module):
+    assert records(scraper_module.CsvDealSource('deals.csv'), csv_text) == [('Lamp', '$10 $20', 'Amazon'), ('', '$15 $30', 'Amazon'), ('Chair', '$30', 'Walmart'), ('Desk', '$1,050.50 $1200', 'Target')]
+
+# fields maps the feed's field names and json lines are read one deal per line
+def test_json_source_fields(scraper_module):
+    source = scraper_module.JsonDealSource('deals.json', fields = json_fields)
+    assert records(source, json_text) == [('LAMP', '$10 $20', 'Walmart'), ('Fan', '$12.5 $25', 'Amazon')]
+    json_lines_text = '\n'.join(json.dumps(record) for record in json.loads(json_text)['items'])
+    assert records(source, json_lines_text) == records(source, json_text)
+
+# the name is the title up to the price and the website is the source or the link's host
+def test_rss_source(scraper_module):
+    assert records(scraper_module.RssDealSource('deals.rss'), rss_text) == [('Apple AirPods Pro', '$189 $249', 'bestbuy.com'), ('Rug', '$25', 'Target')]
+
+def test_deal_source_by_extension(scraper_module):
+    assert type(scraper_module.deal_source('deals.csv')) == scraper_module.CsvDealSource
+    assert type(scraper_module.deal_source('https://example.com/feed.rss?page=1')) == scraper_module.RssDealSource
+    assert type(scraper_module.deal_source('deals.jsonl')) == scraper_module.JsonDealSource
+
+# nameless and single price deals are rejected, a deal in two sources is loaded once and a missing source doesn't stop the others
+def test_bulk_loader(scraper_module, scraper, tmp_path):
+    (tmp_path / 'deals.csv').write_text(csv_text, encoding = 'utf-8')
+    (tmp_path / 'deals.rss').write_text(rss_text, encoding = 'utf-8')
+    with StubServer(routes = {'/deals.json': ('application/json', json_text)}) as server:
+        sources = [scraper_module.deal_source(str(tmp_path / 'deals.csv')), scraper_module.deal_source(server.url() + '/deals.json', fields = json_fields), scraper_module.deal_source(str(tmp_path / 'deals.rss')), scraper_module.deal_source(str(tmp_path / 'missing.csv'))]
+        loader = scraper_module.BulkDealLoader(sources, scraper, batch_size = 2)
+        product_list = loader.load()
+
+    assert sorted((Product_obj.name, Product_obj.price, Product_obj.old_price) for Product_obj in product_list) == [('Apple AirPods Pro', 189, 249), ('Desk', 1050.5, 1200), ('Fan', 12.5, 25), ('Lamp', 10, 20)]
+    assert all(Product_obj.status == 'pending' for Product_obj in product_list)
+    assert len(loader.errors) == 1
+    assert isinstance(loader.errors[0], FileNotFoundError)
+    assert loader.stats.counters['feed records'] == 8
+    assert loader.stats.counters['feed rejected'] == 3
+    assert loader.stats.counters['feed duplicates'] == 1
+    assert loader.stats.counters['feed products'] == 4
+
+def test_iter_products(scraper_module, scraper, tmp_path):
+    (tmp_path / 'deals.csv').write_text(csv_text, encoding = 'utf-8')
+    loader = scraper_module.BulkDealLoader([scraper_module.deal_source(str(tmp_path / 'deals.csv'))], scraper, batch_size = 1)
+    assert [Product_obj.name for Product_obj in loader.iter_products()] == ['Lamp', 'Desk']
+
+# a json lines file with one deal isn't read as a feed object without items
+def test_json_lines_with_one_deal(scraper_module):
+    text = json.dumps({'Name': 'Lamp', 'Price': 10, 'Old Price': 20, 'Website': 'Amazon'}) + '\n'
+    assert records(scraper_module.deal_source('deals.jsonl'), text) == [('Lamp', '$10 $20', 'Amazon')]
+    assert records(scraper_module.deal_source('deals.json'), text) == [('Lamp', '$10 $20', 'Amazon')]
+    assert records(scraper_module.deal_source('deals.json'), json.dumps({'items': []})) == []
+
+def test_deal_source_is_abstract(scraper_module):
+    with pytest.raises(TypeError):
+        scraper_module.DealSource('deals.txt')
@@ -0,0 +1,41 @@
+from selenium.common.exceptions import NoSuchElementException
+from fakes import FakeEbayBrowser
+
+def make_session(scraper_module, browser, cooldown = 60):
+    session = scraper_module.EbaySession(browser = browser, wait_policy = scraper_module.WaitPolicy(default_timeout = .5, settle_time = 0, poll_interval = 0))
+    session.circuit_breaker.cooldown = cooldown
+    return session
+
+# products without the free shipping filter each fail on their own and never open the circuit for the rest
+def test_product_misses_do_not_open_circuit(scraper_module, scraper):
+    session = make_session(scraper_module, FakeEbayBrowser(missing_links = ['Free Shipping']))
+    product_list = [scraper_module.Product('Product ' + str(i), 10, 20, 'Amazon') for i in range(0, 20)]
+
+    scraper.price_products(product_list, session)
+
+    assert [Product_obj.status for Product_obj in product_list] == ['error'] * 20
+    assert all(isinstance(e, NoSuchElementException) for e in scraper.ebay_error_list)
+    assert session.circuit_breaker.opened_time is None
+    assert session.stats.counters['circuit open waits'] == 0
+
+# pages that keep failing to load open the circuit and the session waits it out instead of failing the products that are left
+def test_page_load_failures_wait_for_circuit(scraper_module, scraper):
+    browser = FakeEbayBrowser(page_load_failures = 5)
+    session = make_session(scraper_module, browser, cooldown = .05)
+    product_list = [scraper_module.Product('Product ' + str(i), 10, 20, 'Amazon') for i in range(0, 8)]
+
+    scraper.price_products(product_list, session)
+
+    assert [Product_obj.status for Product_obj in product_list] == ['error'] * 5 + ['priced'] * 3
+    assert session.stats.counters['circuit open waits'] == 1
+    assert session.circuit_breaker.opened_time is None
+    assert product_list[-1].ebay_price == 109
+
+# each scraper's wait policy records its timeouts in that scraper's stats and sessions share both
+def test_wait_policy_uses_scraper_stats(scraper_module):
+    first_scraper, second_scraper = scraper_module.Scraper(), scraper_module.Scraper()
+    assert first_scraper.wait_policy is not second_scraper.wait_policy
+    assert first_scraper.wait_policy.stats is first_scraper.stats
+    session = first_scraper.create_ebay_session('selenium', browser = FakeEbayBrowser())
+    assert session.wait_policy is first_scraper.wait_policy
+    assert session.stats is first_scraper.stats
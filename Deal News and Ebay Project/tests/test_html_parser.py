@@ -0,0 +1,23 @@
+# nested elements with the same class each get their own text
+def test_nested_same_class(scraper_module):
+    parser = scraper_module.ClassTextParser(['s-item__title'])
+    parser.feed('<div class="s-item__title"><span class="s-item__title">Lamp</span> Desk</div><div class="s-item__title">Chair</div>')
+    parser.close()
+    assert parser.get_texts('s-item__title') == ['Lamp Desk', 'Lamp', 'Chair']
+
+# unclosed tags are closed by their parent's end tag and block tags start new lines
+def test_unclosed_tags_and_lines(scraper_module):
+    parser = scraper_module.ClassTextParser(['srp-refine__category__item', 's-item__price'])
+    parser.feed('<ul><li class="srp-refine__category__item">All<br>Categories</li><li class="srp-refine__category__item"><b>Consumer Electronics</li></ul><span class="s-item__price">$20.00</span>')
+    parser.close()
+    assert parser.get_texts('srp-refine__category__item') == ['All\nCategories', 'Consumer Electronics']
+    assert parser.get_texts('s-item__price') == ['$20.00']
+
+# the http backend parses the results page the scraper would read from the browser
+def test_parse_results_page(scraper_module):
+    from bench_fixtures import ebay_results_page
+    ebay_prices, ebay_names, category = scraper_module.EbayHttpSession().parse_results(ebay_results_page('Apple AirPods Pro', listings = 3))
+    assert len(ebay_prices) == 4
+    assert ebay_names[0] == 'Shop on eBay'
+    assert category == ['All Categories', 'Consumer Electronics']
+    assert scraper_module.EbayHttpSession().parse_results('<h3 class="srp-save-null-search__heading">No exact matches found</h3>') is None
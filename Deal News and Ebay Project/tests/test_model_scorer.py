@@ -0,0 +1,42 @@
+import numpy as np
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from model_artifact import ModelScorer, encode_text, save_artifact
+
+vocabulary_list = ['airpods', 'tv', 'cable', 'case']
+good_names = ['Apple AirPods Pro', 'Samsung 65 Inch TV', 'AirPods Max', 'LG OLED TV']
+bad_names = ['USB Cable', 'Phone Case', 'HDMI Cable', 'Silicone Case']
+
+def save_model(model, directory):
+    vocabulary = {word: i for i, word in enumerate(vocabulary_list)}
+    X = encode_text([name.lower() for name in good_names + bad_names], vocabulary)
+    model.fit(X, [1] * len(good_names) + [0] * len(bad_names))
+    save_artifact({'model_name': type(model).__name__, 'model': model, 'dense': False, 'text_columns': [('Name', vocabulary_list)], 'numeric_columns': []}, str(directory))
+    return ModelScorer(directory = str(directory))
+
+# the scorer doesn't lowercase names so the products are named like the training rows
+def products(scraper_module, names):
+    return [scraper_module.Product(name.lower(), 10, 20, 'Amazon') for name in names]
+
+# the svc that can be saved scores with probabilities
+def test_svc_has_probabilities(ml_module):
+    model_pipeline, model_list = ml_module.build_model_pipeline()
+    assert all(hasattr(model, 'predict_proba') for model in model_pipeline)
+
+# models without predict_proba score between 0 and 1 in the order of their decision function instead of 0 or 1
+def test_decision_function_scores(scraper_module, tmp_path):
+    scorer = save_model(SGDClassifier(loss = 'hinge', random_state = 22), tmp_path)
+    product_list = products(scraper_module, ['Apple AirPods Pro', 'HDMI Cable', 'Lamp'])
+    probabilities = scorer.predict([Product_obj.excel_format() for Product_obj in product_list], scraper_module.excel_columns)
+    assert ((probabilities > 0) & (probabilities < 1)).all()
+    assert probabilities[0] > probabilities[2] > probabilities[1]
+    assert not set(np.round(probabilities, 6)).issubset({0, 1})
+
+# products are scored in one batch and only the ones the model confidently rejects are skipped
+def test_skip_rejected_products(scraper_module, scraper, tmp_path):
+    scorer = save_model(LogisticRegression(C = 10), tmp_path)
+    scraper.product_list.extend(products(scraper_module, ['AirPods Pro Case', 'Sony TV', 'USB C Cable', 'Lamp']))
+    probabilities = scraper.predict(scorer)
+    assert len(probabilities) == 4
+    assert probabilities[1] > .5 > probabilities[2]
+    scraper.skip_rejected_products(scorer, threshold = .25)
+    assert [Product_obj.name for Product_obj in scraper.product_list] == ['airpods pro case', 'sony tv', 'lamp']
@@ -0,0 +1,47 @@
+import threading
+from test_pricing import FlakySession
+
+class ClosedSession(FlakySession):
+
+    def open(self):
+        raise ConnectionError('No browser')
+
+def run_in_thread(function):
+    errors = []
+    def run():
+        try:
+            function()
+        except Exception as e:
+            errors.append(e)
+    thread = threading.Thread(target = run, daemon = True)
+    thread.start()
+    thread.join(timeout = 20)
+    assert thread.is_alive() == False, 'run_pipeline hung'
+    return errors
+
+# when every worker fails to start the producer stops instead of blocking on the full queue and the error is raised
+def test_pipeline_stops_when_workers_fail(scraper_module, scraper, tmp_path):
+    def create_ebay_session(backend = 'selenium', browser = None, rate_limiter = None):
+        raise ConnectionError('No browser')
+    scraper.create_ebay_session = create_ebay_session
+    product_list = [scraper_module.Product('Product ' + str(i), '$10 $20', 'Amazon') for i in range(0, 300)]
+    errors = run_in_thread(lambda: scraper.run_pipeline(product_list, checkpoint_file = str(tmp_path / 'Checkpoint.jsonl'), workers = 2, requests_per_second = 0, queue_size = 10))
+    assert len(errors) == 1
+    assert isinstance(errors[0], ConnectionError)
+
+# a worker whose session doesn't open stops but the other worker prices every product and the error is still raised
+def test_pipeline_keeps_going_with_one_worker(scraper_module, scraper, tmp_path):
+    sessions = []
+    def create_ebay_session(backend = 'selenium', browser = None, rate_limiter = None):
+        if(len(sessions) == 0):
+            sessions.append(ClosedSession())
+        else:
+            sessions.append(FlakySession())
+        return sessions[-1]
+    scraper.create_ebay_session = create_ebay_session
+    product_list = [scraper_module.Product('Product ' + str(i), 10, 20, 'Amazon') for i in range(0, 50)]
+    errors = run_in_thread(lambda: scraper.run_pipeline(product_list, checkpoint_file = str(tmp_path / 'Checkpoint.jsonl'), workers = 2, requests_per_second = 0, queue_size = 5))
+    assert len(errors) == 1
+    assert isinstance(errors[0], ConnectionError)
+    assert all(Product_obj.status in ['priced', 'rejected', 'error'] for Product_obj in product_list)
+    assert sessions[1].searches == 50
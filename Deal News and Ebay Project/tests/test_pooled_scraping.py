@@ -0,0 +1,55 @@
+import os
+import time
+from bench_fixtures import StubServer
+from fakes import FakeEbayBrowser
+
+names = ['Apple AirPods Pro 2nd Generation Wireless Earbuds', 'Samsung 65 Inch Crystal UHD 4K Smart TV', 'Dyson V8 Cordless Stick Vacuum Cleaner', 'Instant Pot Duo 7 in 1 Electric Pressure Cooker', 'Sony WH 1000XM4 Noise Canceling Headphones', 'Lego Star Wars Millennium Falcon Building Kit', 'Nintendo Switch OLED Model Console White', 'Ninja Air Fryer 4 Quart Black']
+
+def scraped_products(scraper_module, scraper, server, pooled = False):
+    scraper.create_ebay_session = lambda backend = 'selenium', browser = None, rate_limiter = None: scraper_module.EbayHttpSession(connection_pool = scraper_module.ConnectionPool(), rate_limiter = rate_limiter, stats = scraper.stats, base_url = server.url())
+    scraper.product_list[:] = [scraper_module.Product(name, 10 + i, 40 + i, 'Amazon') for i, name in enumerate(names)]
+    if(pooled):
+        scraper.scrape_ebay_pooled(workers = 4, requests_per_second = 0, backend = 'http')
+    else:
+        scraper.scrape_ebay(backend = 'http')
+    return [(Product_obj.name, Product_obj.ebay_price, Product_obj.category, Product_obj.difference_price) for Product_obj in scraper.product_list]
+
+# the pool of sessions prices the same products the same way as one session
+def test_pooled_matches_serial(scraper_module, scraper):
+    with StubServer() as server:
+        serial_results = scraped_products(scraper_module, scraper, server)
+        pooled_results = scraped_products(scraper_module, scraper, server, pooled = True)
+    assert len(serial_results) > 0
+    assert pooled_results == serial_results
+
+def selenium_products(scraper_module, scraper, monkeypatch, browsers, pooled = False):
+    monkeypatch.setattr(scraper_module, 'create_browser', lambda: browsers.pop(0) if len(browsers) > 0 else FakeEbayBrowser(no_match_names = names[3:4], failing_names = names[5:6]))
+    scraper._browser = None
+    scraper.ebay_error_list[:] = []
+    scraper.product_list[:] = [scraper_module.Product(name, 10 + i, 40 + i, 'Amazon') for i, name in enumerate(names)]
+    product_list = list(scraper.product_list)
+    if(pooled):
+        scraper.scrape_ebay_pooled(workers = 3, requests_per_second = 0, backend = 'selenium')
+    else:
+        scraper.scrape_ebay(backend = 'selenium')
+    return product_list
+
+# the selenium pool prices products the same way as the scraper browser
+def test_selenium_pooled_matches_serial(scraper_module, scraper, monkeypatch):
+    serial_product_list = selenium_products(scraper_module, scraper, monkeypatch, [])
+    serial_results = [(Product_obj.name, Product_obj.status, Product_obj.ebay_price, Product_obj.category, Product_obj.difference_price) for Product_obj in serial_product_list]
+    pooled_product_list = selenium_products(scraper_module, scraper, monkeypatch, [], pooled = True)
+    pooled_results = [(Product_obj.name, Product_obj.status, Product_obj.ebay_price, Product_obj.category, Product_obj.difference_price) for Product_obj in pooled_product_list]
+    assert [result[1] for result in serial_results].count('priced') == 6
+    assert pooled_results == serial_results
+
+# a worker whose browser doesn't open only fails its product and the run still keeps the priced products and exports the errors
+def test_selenium_pooled_browser_fails_to_open(scraper_module, scraper, monkeypatch, tmp_path):
+    monkeypatch.setattr(time, 'sleep', lambda seconds: None)
+    product_list = selenium_products(scraper_module, scraper, monkeypatch, [FakeEbayBrowser(page_load_failures = 5)], pooled = True)
+    statuses = [Product_obj.status for Product_obj in product_list]
+    assert statuses.count('error') == 2
+    assert statuses.count('rejected') == 1
+    assert all(Product_obj.status == 'priced' for Product_obj in scraper.product_list)
+    assert len(scraper.product_list) == 5
+    assert os.path.exists(tmp_path / 'Scraping Error Data.xlsx')
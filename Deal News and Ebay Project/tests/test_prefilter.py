@@ -0,0 +1,49 @@
+import pandas as pd
+
+def history(scraper_module, rows = []):
+    return pd.DataFrame([list(row) + ['N/A', 0, 0, 0, 0] for row in rows], columns = scraper_module.excel_columns)
+
+# with no history (like the first run on an empty store) every product is kept
+def test_no_history_keeps_everything(scraper_module):
+    product_list = [scraper_module.Product('Lamp', 10, 20, 'Amazon')]
+    empty_store_df = pd.DataFrame({column: pd.Series([], dtype = object) for column in scraper_module.excel_columns})
+    for ProfitPrefilter_obj in [scraper_module.ProfitPrefilter(), scraper_module.ProfitPrefilter(empty_store_df)]:
+        assert ProfitPrefilter_obj.name_prices == {}
+        assert ProfitPrefilter_obj.website_ratios == {}
+        assert ProfitPrefilter_obj.filter(product_list) == (product_list, [])
+
+# one past listing of a product isn't trusted over the website ratio
+def test_name_prices_need_min_history(scraper_module):
+    rows = [('Lamp', 10, 20, 'Amazon', 11)] + [('Chair ' + str(i), 10, 20, 'Amazon', 100) for i in range(0, 5)]
+    ProfitPrefilter_obj = scraper_module.ProfitPrefilter(history(scraper_module, rows))
+    assert ProfitPrefilter_obj.name_prices == {}
+    kept_products, dropped_products = ProfitPrefilter_obj.filter([scraper_module.Product('Lamp', 10, 20, 'Amazon')])
+    assert len(kept_products) == 1
+
+    rows = [('Lamp', 10, 20, 'Amazon', 11)] * 5 + [('Chair ' + str(i), 10, 20, 'Amazon', 100) for i in range(0, 5)]
+    ProfitPrefilter_obj = scraper_module.ProfitPrefilter(history(scraper_module, rows))
+    assert ProfitPrefilter_obj.name_prices == {'lamp': 11}
+    kept_products, dropped_products = ProfitPrefilter_obj.filter([scraper_module.Product('Lamp', 10, 20, 'Amazon')])
+    assert len(dropped_products) == 1
+
+# minutes saved come from the timed ebay lookups of this run or else the last run report
+def test_minutes_saved_from_lookup_timings(scraper_module, scraper, tmp_path, capsys):
+    history_df = history(scraper_module, [('Chair ' + str(i), 10, 20, 'Amazon', 20) for i in range(0, 5)])
+    ProfitPrefilter_obj = scraper_module.ProfitPrefilter(history_df, seconds_per_lookup = 10)
+    report_file = str(tmp_path / 'Run Report.json')
+    def prefilter():
+        scraper.product_list[:] = [scraper_module.Product('Lamp ' + str(i), 10, 20, 'Amazon') for i in range(0, 12)]
+        scraper.prefilter_products(ProfitPrefilter_obj, report_file = report_file)
+        return capsys.readouterr().out
+
+    assert 'Skipping 12 ebay lookups' in prefilter()
+    assert '(about 2.0 minutes saved)' in prefilter()
+
+    scraper.stats.record('ebay lookup', 4)
+    scraper.stats.record('ebay lookup', 6)
+    assert '(about 1.0 minutes saved)' in prefilter()
+    scraper.stats.write_report(file = report_file)
+
+    scraper.stats = scraper_module.RunStats()
+    assert '(about 1.0 minutes saved)' in prefilter()
+    assert scraper.stats.counters['prefiltered products'] == 12
@@ -0,0 +1,71 @@
+import time
+from sklearn.linear_model import LogisticRegression
+from model_artifact import ModelScorer, save_artifact
+
+day = 24 * 60 * 60
+
+def test_aggregates(scraper_module, tmp_path):
+    history = scraper_module.PriceHistory(str(tmp_path / 'Products.db'))
+    now = time.time()
+    history.record_many([('Apple AirPods Pro', 'ebay', [150, 200, 250], now), ('apple airpods pro!', 'deal news', [180], now - 10 * day), ('Apple AirPods Pro', 'deal news', [160], now)])
+    aggregates = history.aggregates('APPLE AirPods Pro')
+    assert (aggregates['ebay_count'], aggregates['ebay_min'], aggregates['ebay_median']) == (3, 150, 200)
+    assert round(aggregates['ebay_volatility'], 3) == round(40.825 / 200, 3)
+    assert round(aggregates['deal_news_trend'], 3) == -2
+    assert history.estimate('Apple AirPods Pro', 'ebay_min') == 150
+    assert history.estimate('Lamp') is None
+    assert history.features('Apple AirPods Pro')[0] == 200
+    assert history.features('Lamp') == [0, 0, 0]
+
+# prices that leave the window stop counting when the aggregates are read even without new prices
+def test_aggregates_expire(scraper_module, tmp_path, monkeypatch):
+    history = scraper_module.PriceHistory(str(tmp_path / 'Products.db'), window_days = 90)
+    now = time.time()
+    history.record_many([('Lamp', 'ebay', [40], now - 80 * day), ('Lamp', 'ebay', [60], now - 10 * day)])
+    assert history.estimate('Lamp') == 50
+    monkeypatch.setattr(time, 'time', lambda: now + 20 * day)
+    assert history.estimate('Lamp') == 60
+    monkeypatch.setattr(time, 'time', lambda: now + 200 * day)
+    assert history.estimate('Lamp') is None
+
+    # expired aggregates are also recomputed when the history is opened so the ML analysis doesn't read them
+    monkeypatch.setattr(time, 'time', lambda: now + 100 * day)
+    history.record_many([('Chair', 'ebay', [30], now + 100 * day)])
+    assert history.connection.execute("SELECT ebay_count FROM price_aggregates WHERE name_key = 'chair'").fetchone() == (1,)
+    history.close()
+    monkeypatch.setattr(time, 'time', lambda: now + 300 * day)
+    history = scraper_module.PriceHistory(str(tmp_path / 'Products.db'), window_days = 90)
+    assert history.connection.execute("SELECT ebay_count FROM price_aggregates WHERE name_key = 'chair'").fetchone() == (0,)
+
+# the prices already in the product store are imported once
+def test_import_store(scraper_module, tmp_path):
+    store = scraper_module.ProductStore(str(tmp_path / 'Products.db'))
+    store.add_products([scraper_module.Product('Lamp', 10, 20, 'Amazon', 80, 'Home', 59, 1), scraper_module.Product('Chair', 30, 60, 'Walmart', 90, 'Home', 48, 1)])
+    history = scraper_module.PriceHistory(store.file)
+    assert history.import_store(store) == 2
+    assert history.estimate('Lamp') == 80
+    assert history.aggregates('Chair')['deal_news_last'] == 30
+    assert history.import_store(store) == 0
+    assert history.connection.execute('SELECT COUNT(*) FROM price_points').fetchone() == (4,)
+
+# a model trained with the price aggregate columns (read_product_data with price aggregates) can score the scraper's products
+def test_predict_with_price_aggregates(scraper_module, ml_module, scraper, tmp_path):
+    store = scraper_module.ProductStore(str(tmp_path / 'Products.db'))
+    product_list = [scraper_module.Product('Lamp ' + str(i), 10, 20, 'Amazon', 80 + i, 'Home', 59, i % 2) for i in range(0, 10)]
+    store.add_products(product_list)
+    history = scraper_module.PriceHistory(store.file)
+    history.import_store(store)
+    store.close()
+
+    df = ml_module.read_product_data(str(tmp_path / 'Products.db'), price_aggregates = True)
+    assert list(df['Ebay Median']) == list(range(80, 90))
+    numeric_columns = ['Price'] + scraper_module.price_aggregate_columns
+    model = LogisticRegression().fit(df[numeric_columns].to_numpy(), df['Binary Answer'])
+    save_artifact({'model_name': 'Logistic Regression', 'model': model, 'dense': False, 'text_columns': [], 'numeric_columns': numeric_columns}, str(tmp_path))
+
+    scraper.price_history = history
+    scraper.product_list.extend(product_list)
+    probabilities = scraper.predict(ModelScorer(directory = str(tmp_path)))
+    assert len(probabilities) == 10
+    scraper.price_history = None
+    assert len(scraper.predict(ModelScorer(directory = str(tmp_path)))) == 10
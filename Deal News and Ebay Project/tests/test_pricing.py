@@ -0,0 +1,41 @@
+import os
+
+# an ebay session that fails every other lookup and finds no exact match for names ending in 4
+class FlakySession():
+
+    def __init__(self):
+        self.searches = 0
+
+    def open(self):
+        pass
+
+    def search(self, name):
+        self.searches += 1
+        if(self.searches % 2 == 0):
+            raise ConnectionError('Lookup failed')
+        if(name.endswith('4')):
+            return None
+        return ['$20.00', '$' + str(100 + len(name)) + '.00'], ['Shop on eBay', name], ['All Categories', 'Consumer Electronics']
+
+    def close(self):
+        pass
+
+# every product ends up priced, rejected or error and only the priced ones are kept
+def test_no_products_are_skipped(scraper_module, scraper, tmp_path):
+    session = FlakySession()
+    scraper.create_ebay_session = lambda backend = 'selenium', browser = None, rate_limiter = None: session
+    product_list = [scraper_module.Product('Product ' + str(i), 10, 20, 'Amazon') for i in range(0, 20)]
+    scraper.product_list.extend(product_list)
+
+    scraper.scrape_ebay(backend = 'http')
+
+    assert session.searches == 20
+    assert [Product_obj.status for Product_obj in product_list[0:6]] == ['priced', 'error', 'priced', 'error', 'rejected', 'error']
+    assert all(Product_obj.status in ['priced', 'rejected', 'error'] for Product_obj in product_list)
+    assert [Product_obj.status for Product_obj in product_list].count('error') == 10
+    assert [Product_obj.status for Product_obj in product_list].count('rejected') == 2
+    assert scraper.product_list == [Product_obj for Product_obj in product_list if Product_obj.status == 'priced']
+    assert len(scraper.product_list) == 8
+    assert len(scraper.ebay_error_list) == 10
+    assert scraper.stats.counters['products'] == 20
+    assert os.path.exists(tmp_path / 'Scraping Error Data.xlsx')
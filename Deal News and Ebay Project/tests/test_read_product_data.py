@@ -0,0 +1,33 @@
+import os
+import sqlite3
+import pandas as pd
+
+def write_excel(scraper_module, file):
+    df = pd.DataFrame([['Lamp', 10, 20, 'Amazon', 80, 'Home', 59, 1, 1, 0]], columns = scraper_module.excel_columns)
+    df.to_excel(file, index = False)
+    return df
+
+# a missing .db isn't created and the excel file next to it is read
+def test_missing_db_reads_excel(scraper_module, ml_module, tmp_path):
+    excel_df = write_excel(scraper_module, tmp_path / 'Products.xlsx')
+    df = ml_module.read_product_data(str(tmp_path / 'Products.db'))
+    assert not os.path.exists(tmp_path / 'Products.db')
+    pd.testing.assert_frame_equal(df, excel_df)
+
+# a .db without the products table also reads the excel file and price aggregates are 0
+def test_db_without_products_reads_excel(scraper_module, ml_module, tmp_path):
+    write_excel(scraper_module, tmp_path / 'Products.xlsx')
+    sqlite3.connect(str(tmp_path / 'Products.db')).close()
+    df = ml_module.read_product_data(str(tmp_path / 'Products.db'), price_aggregates = True)
+    assert list(df['Name']) == ['Lamp']
+    assert list(df['Ebay Median']) == [0]
+
+# the product store is read without writing to it
+def test_reads_product_store(scraper_module, ml_module, tmp_path):
+    store = scraper_module.ProductStore(str(tmp_path / 'Products.db'))
+    store.add_products([scraper_module.Product('Lamp', 10, 20, 'Amazon', 80, 'Home', 59, 1)])
+    store.close()
+    df = ml_module.read_product_data(str(tmp_path / 'Products.db'), price_aggregates = True)
+    assert list(df['Name']) == ['Lamp']
+    assert list(df['Ebay Price']) == [80]
+    assert list(df['Ebay Median']) == [0]